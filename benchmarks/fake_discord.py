@@ -0,0 +1,293 @@
+import asyncio
+import itertools
+import time
+from typing import Dict, List, Optional
+import aiohttp
+import discord
+from aiohttp import web
+
+# A local stand-in for the parts of Discord's REST API that interaction handlers
+# use, plus Interaction/Message fakes that talk to it over real HTTP. Handlers run
+# unmodified; every ack and followup pays a JSON encode and a local round trip.
+
+_ids = itertools.count(1_000_000_000)
+
+class DiscordStandIn:
+    """
+    aiohttp server answering interaction callbacks and webhook (followup) calls.
+    latency_ms adds a fixed delay to every request, like a distant API.
+    """
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000.0
+        self.requests = 0
+        self.base_url = None
+        self.messages: Dict[int, "FakeMessage"] = {}
+        self._runner = None
+
+    def add_message(self, content: str, channel_id: int, author: Optional["FakeUser"] = None) -> "FakeMessage":
+        """
+        A message that fetch_message and history can read back through the stand-in.
+        """
+        message = FakeMessage(content, channel_id, author=author)
+        self.messages[message.id] = message
+        return message
+
+    async def _get_history(self, request: web.Request) -> web.Response:
+        # Like GET /channels/{id}/messages: newest first, or oldest first after `after`
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        channel_id = int(request.match_info["channel_id"])
+        limit = int(request.query.get("limit", 50))
+        before = int(request.query["before"]) if "before" in request.query else None
+        after = int(request.query["after"]) if "after" in request.query else None
+        ids = sorted(
+            message_id for message_id, message in self.messages.items()
+            if message.channel.id == channel_id
+            and (before is None or message_id < before)
+            and (after is None or message_id > after)
+        )
+        ids = ids[:limit] if after is not None else ids[::-1][:limit]
+        return web.json_response([self.messages[message_id].to_dict() for message_id in ids])
+
+    async def _get_message(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = self.messages.get(int(request.match_info["message_id"]))
+        if message is None:
+            return web.json_response({"message": "Unknown Message", "code": 10008}, status=404)
+        return web.json_response(message.to_dict())
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if request.can_read_body:
+            await request.read()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.method == "DELETE" or request.path.endswith("/callback"):
+            return web.Response(status=204)
+        return web.json_response({"id": str(next(_ids))})
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/api/v10/channels/{channel_id}/messages", self._get_history)
+        app.router.add_get("/api/v10/channels/{channel_id}/messages/{message_id}", self._get_message)
+        app.router.add_route("*", "/api/v10/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/api/v10"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+class FakeUser:
+    def __init__(self, user_id: int, bot: bool = False):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.display_name = self.name
+        self.bot = bot
+
+class FakeMessage:
+    def __init__(self, content: str, channel_id: int, message_id: Optional[int] = None,
+                 author: Optional[FakeUser] = None):
+        self.id = message_id or next(_ids)
+        self.channel = type("FakeChannel", (), {"id": channel_id})()
+        self.content = content
+        self.author = author or FakeUser(0)
+        self.jump_url = f"https://discord.com/channels/@me/{channel_id}/{self.id}"
+
+    def to_dict(self) -> dict:
+        return {
+            "id": str(self.id),
+            "channel_id": str(self.channel.id),
+            "content": self.content,
+            "author": {"id": str(self.author.id), "bot": self.author.bot}
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FakeMessage":
+        author = FakeUser(int(data["author"]["id"]), data["author"]["bot"])
+        return cls(data["content"], int(data["channel_id"]), int(data["id"]), author)
+
+class FakeChannel:
+    def __init__(self, interaction: "FakeInteraction", channel_id: int):
+        self._interaction = interaction
+        self.id = channel_id
+
+    def _read(self, data: dict) -> FakeMessage:
+        message = FakeMessage.from_dict(data)
+        # Without the Message Content intent, other users' messages come back empty
+        if not self._interaction.client.intents.message_content:
+            message.content = ""
+        return message
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        url = f"{self._interaction._base_url}/channels/{self.id}/messages/{message_id}"
+        async with self._interaction._session.get(url) as response:
+            data = await response.json()
+            if response.status == 404:
+                raise discord.NotFound(response, data)
+            response.raise_for_status()
+        return self._read(data)
+
+    async def history(self, limit: Optional[int] = 100, before=None, after=None, oldest_first=None):
+        # Pages of up to 100 like discord.py; oldest first when `after` is given
+        oldest_first = after is not None if oldest_first is None else oldest_first
+        url = f"{self._interaction._base_url}/channels/{self.id}/messages"
+        before_id = before.id if before is not None else None
+        after_id = after.id if after is not None else (0 if oldest_first else None)
+        remaining = limit
+        while remaining is None or remaining > 0:
+            params = {"limit": 100 if remaining is None else min(100, remaining)}
+            if oldest_first:
+                params["after"] = after_id
+            elif before_id is not None:
+                params["before"] = before_id
+            async with self._interaction._session.get(url, params=params) as response:
+                response.raise_for_status()
+                page = [self._read(data) for data in await response.json()]
+            if not page:
+                return
+            for message in page:
+                yield message
+            if remaining is not None:
+                remaining -= len(page)
+            if oldest_first:
+                after_id = page[-1].id
+            else:
+                before_id = page[-1].id
+
+class FakeClient:
+    def __init__(self, message_content: bool = False):
+        self.intents = discord.Intents.default()
+        self.intents.message_content = message_content
+
+class Recorder:
+    """
+    Timing for one interaction: when it was created, acked and followed up.
+    """
+    def __init__(self):
+        self.created = time.perf_counter()
+        self.acked = None
+        self.followups: List[float] = []
+        self.error_replies = 0
+
+    def ack(self):
+        if self.acked is None:
+            self.acked = time.perf_counter()
+
+    def followup(self):
+        self.followups.append(time.perf_counter())
+
+def _payload(content=None, embed=None, embeds=None, view=None, ephemeral=False) -> dict:
+    data = {"content": content, "flags": 64 if ephemeral else 0}
+    embeds = list(embeds or []) + ([embed] if embed is not None else [])
+    if embeds:
+        data["embeds"] = [item.to_dict() for item in embeds]
+    if view is not None:
+        data["components"] = view.to_components()
+    return data
+
+class FakeWebhookMessage:
+    def __init__(self, interaction: "FakeInteraction", message_id: str):
+        self._interaction = interaction
+        self.id = message_id
+
+    async def edit(self, content=None, embed=None, embeds=None, view=None, **kwargs):
+        await self._interaction._request("PATCH", f"/messages/{self.id}", _payload(content, embed, embeds, view))
+        return self
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+
+    async def send(self, content=None, *, embed=None, embeds=None, view=None, ephemeral=False, wait=False, **kwargs):
+        data = await self._interaction._request("POST", "", _payload(content, embed, embeds, view, ephemeral))
+        self._interaction.recorder.followup()
+        if content and content.startswith("Error"):
+            self._interaction.recorder.error_replies += 1
+        return FakeWebhookMessage(self._interaction, data["id"])
+
+class FakeResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _callback(self, kind: int, data: Optional[dict] = None):
+        if self._done:
+            raise RuntimeError("This interaction has already been responded to before")
+        self._done = True
+        await self._interaction._request("POST", "/callback", {"type": kind, "data": data}, callback=True)
+        self._interaction.recorder.ack()
+
+    async def send_message(self, content=None, *, embed=None, embeds=None, view=None, ephemeral=False, **kwargs):
+        self._interaction.sent_view = view
+        await self._callback(4, _payload(content, embed, embeds, view, ephemeral))
+
+    async def defer(self, *, ephemeral=False, thinking=False):
+        # Deferring a component interaction acks it without a new message
+        kind = 6 if self._interaction.is_component and not thinking else 5
+        await self._callback(kind, {"flags": 64 if ephemeral else 0})
+
+    async def edit_message(self, content=None, *, embed=None, embeds=None, view=None, **kwargs):
+        if view is not None:
+            self._interaction.sent_view = view
+        await self._callback(7, _payload(content, embed, embeds, view))
+
+class FakeInteraction:
+    """
+    Stands in for discord.Interaction. Acks and followups are sent to the stand-in.
+    """
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, user_id: int,
+                 guild_id: Optional[int] = None, locale: str = "en-US",
+                 guild_locale: Optional[str] = "en-US", is_component: bool = False,
+                 message: Optional[FakeMessage] = None, recorder: Optional[Recorder] = None,
+                 message_content: bool = False):
+        self.id = next(_ids)
+        self.application_id = 1
+        self.token = f"token-{self.id}"
+        self.user = FakeUser(user_id)
+        self.guild_id = guild_id
+        self.channel_id = message.channel.id if message is not None else next(_ids)
+        self.channel = FakeChannel(self, self.channel_id)
+        self.client = FakeClient(message_content)
+        self.locale = locale
+        self.guild_locale = guild_locale
+        self.is_component = is_component
+        self.message = message
+        self.recorder = recorder or Recorder()
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.sent_view = None
+        self._session = session
+        self._base_url = base_url
+
+    async def _request(self, method: str, path: str, payload: Optional[dict] = None, callback: bool = False) -> dict:
+        if callback:
+            url = f"{self._base_url}/interactions/{self.id}/{self.token}{path}"
+        else:
+            url = f"{self._base_url}/webhooks/{self.application_id}/{self.token}{path}"
+        async with self._session.request(method, url, json=payload) as response:
+            response.raise_for_status()
+            if response.status == 204:
+                return {}
+            return await response.json()
+
+    async def original_response(self):
+        return FakeWebhookMessage(self, "@original")
+
+    async def edit_original_response(self, content=None, *, embed=None, embeds=None, view=None, **kwargs):
+        await self._request("PATCH", "/messages/@original", _payload(content, embed, embeds, view))
+
+    async def delete_original_response(self):
+        await self._request("DELETE", "/messages/@original")
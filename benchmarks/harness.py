@@ -0,0 +1,221 @@
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Dict, List, Optional
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(name: str, samples_ns: List[int], elapsed: float, peak_bytes: int) -> dict:
+    return {
+        "name": name,
+        "ops": len(samples_ns),
+        "ops_per_sec": len(samples_ns) / elapsed if elapsed else 0.0,
+        "p50_us": percentile(samples_ns, 50) / 1000.0,
+        "p99_us": percentile(samples_ns, 99) / 1000.0,
+        "peak_alloc_bytes": peak_bytes
+    }
+
+def _reference_op(i: int):
+    return sorted({str(i * j): j for j in range(32)})
+
+def reference_speed(duration: float = 0.15, rounds: int = 3) -> float:
+    """
+    Calls per second of a fixed pure-Python workload. Measured next to every
+    benchmark, so results can be compared relative to how fast the machine was
+    at that moment: shared machines speed up and slow down by far more than
+    the regressions the suite is looking for.
+    """
+    best = 0.0
+    for _ in range(rounds):
+        calls = 0
+        start = time.perf_counter()
+        deadline = start + duration / rounds
+        while time.perf_counter() < deadline:
+            _reference_op(calls)
+            calls += 1
+        best = max(best, calls / (time.perf_counter() - start))
+    return best
+
+def relative_change(result: dict, previous: dict) -> float:
+    """
+    Throughput change against a previous result, relative to the machine's
+    reference speed when both have one.
+    """
+    change = result["ops_per_sec"] / previous["ops_per_sec"]
+    if result.get("reference_ops_per_sec") and previous.get("reference_ops_per_sec"):
+        change /= result["reference_ops_per_sec"] / previous["reference_ops_per_sec"]
+    return change - 1.0
+
+def _reset_peak():
+    # tracemalloc.reset_peak only exists on Python 3.9+
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+def _peak_allocation(run_once: Callable[[], None], rounds: int = 20) -> int:
+    # Highest memory traced while a single operation runs
+    tracemalloc.start()
+    try:
+        peak = 0
+        for _ in range(rounds):
+            start, _ = tracemalloc.get_traced_memory()
+            _reset_peak()
+            run_once()
+            _, round_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, round_peak - start)
+        return peak
+    finally:
+        tracemalloc.stop()
+
+# Rounds per benchmark; the fastest is kept, like timeit, so a noisy neighbour
+# or a first round that warms caches up doesn't show up as a regression
+ROUNDS = 5
+
+def _fastest(best: Optional[dict], result: dict) -> dict:
+    return result if best is None or result["ops_per_sec"] > best["ops_per_sec"] else best
+
+def bench_sync(name: str, op: Callable[[int], object], duration: float, min_ops: int = 50,
+               rounds: int = ROUNDS) -> dict:
+    """
+    Call op(i) repeatedly for about `duration` seconds, timing every call.
+    The time is split into rounds and the fastest round is kept. The garbage
+    collector runs between rounds, not during them.
+    """
+    counter = iter(range(10 ** 9))
+    peak = _peak_allocation(lambda: op(next(counter)))
+    reference = reference_speed()
+    clock = time.perf_counter_ns
+    best = None
+    for _ in range(rounds):
+        samples = []
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            deadline = start + duration / rounds
+            while len(samples) < min_ops or time.perf_counter() < deadline:
+                i = next(counter)
+                before = clock()
+                op(i)
+                samples.append(clock() - before)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = _fastest(best, summarize(name, samples, elapsed, peak))
+    return {**best, "reference_ops_per_sec": reference}
+
+async def bench_async(name: str, op: Callable[[int], Awaitable], duration: float,
+                      concurrency: int = 1, min_ops: int = 50, rounds: int = ROUNDS) -> dict:
+    """
+    Await op(i) from `concurrency` workers for about `duration` seconds, split
+    into rounds like bench_sync. ops/sec is the combined throughput; latencies
+    are per call.
+    """
+    counter = iter(range(10 ** 9))
+    tracemalloc.start()
+    try:
+        peak = 0
+        for _ in range(5):
+            begin, _ = tracemalloc.get_traced_memory()
+            _reset_peak()
+            await op(next(counter))
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - begin)
+    finally:
+        tracemalloc.stop()
+
+    reference = reference_speed()
+    clock = time.perf_counter_ns
+    best = None
+    for _ in range(rounds):
+        samples = []
+        deadline = time.perf_counter() + duration / rounds
+
+        async def worker():
+            while len(samples) < min_ops or time.perf_counter() < deadline:
+                i = next(counter)
+                before = clock()
+                await op(i)
+                samples.append(clock() - before)
+
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = _fastest(best, summarize(name, samples, elapsed, peak))
+    return {**best, "reference_ops_per_sec": reference}
+
+def load_baseline(path: str) -> Dict[str, dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {result["name"]: result for result in json.load(f)["results"]}
+    except FileNotFoundError:
+        return {}
+
+def save_baseline(path: str, results: List[dict], meta: Optional[dict] = None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta or {}, "results": results}, f, indent=2)
+        f.write("\n")
+
+def _relative_speed(result: dict) -> float:
+    return result["ops_per_sec"] / (result.get("reference_ops_per_sec") or 1.0)
+
+def median_results(runs: List[List[dict]]) -> List[dict]:
+    """
+    Per benchmark, the run with the median relative throughput, so one lucky or unlucky
+    run doesn't set the baseline.
+    """
+    by_name = {}
+    for results in runs:
+        for result in results:
+            by_name.setdefault(result["name"], []).append(result)
+    return [
+        sorted(results, key=_relative_speed)[len(results) // 2]
+        for results in by_name.values()
+    ]
+
+def best_results(runs: List[List[dict]]) -> List[dict]:
+    """
+    Per benchmark, the run with the highest throughput relative to the reference speed.
+    """
+    best = {}
+    for results in runs:
+        for result in results:
+            previous = best.get(result["name"])
+            if previous is None or _relative_speed(result) > _relative_speed(previous):
+                best[result["name"]] = result
+    return list(best.values())
+
+def find_regressions(results: List[dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """
+    Benchmarks whose throughput dropped more than `threshold` (0.25 = 25%) below
+    baseline, relative to the machine's reference speed.
+    """
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["name"])
+        if previous is None or not previous["ops_per_sec"]:
+            continue
+        change = relative_change(result, previous)
+        if change < -threshold:
+            regressions.append(f"{result['name']}: {change:+.1%} ops/sec vs baseline")
+    return regressions
+
+def print_table(results: List[dict], baseline: Dict[str, dict]):
+    print(f"{'benchmark':<44}{'ops/sec':>12}{'p50 us':>11}{'p99 us':>11}{'peak KiB':>10}{'vs base':>9}")
+    for result in results:
+        previous = baseline.get(result["name"])
+        change = ""
+        if previous and previous["ops_per_sec"]:
+            change = f"{relative_change(result, previous):+.0%}"
+        print(
+            f"{result['name']:<44}{result['ops_per_sec']:>12.0f}{result['p50_us']:>11.1f}"
+            f"{result['p99_us']:>11.1f}{result['peak_alloc_bytes'] / 1024:>10.1f}{change:>9}"
+        )
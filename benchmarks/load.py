@@ -0,0 +1,266 @@
+"""
+End-to-end interaction load harness. Drives the real command, context menu and
+Submit button handlers at a target rate, using fake interactions backed by a local
+stand-in for Discord's REST API and the offline fake translation backend.
+
+    python -m benchmarks.load --rate 200 --duration 10
+    python -m benchmarks.load --sweep 50,100,200,400,800 --fake-latency-ms 150
+
+Interactions are started on a fixed schedule (open loop), so when handlers fall
+behind, the ack latency grows instead of the offered load quietly dropping.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Optional
+import aiohttp
+from benchmarks.fake_discord import DiscordStandIn, FakeInteraction, FakeMessage, FakeUser
+from benchmarks.harness import percentile
+
+# Discord drops interactions that aren't acknowledged within 3 seconds
+ACK_DEADLINE = 3.0
+
+SAMPLE_TEXTS = (
+    "Server maintenance starts in 10 minutes, please save your work.",
+    "New patch notes are up in #announcements!",
+    "¿Alguien quiere jugar esta noche?",
+    "Die Abstimmung endet morgen um 18 Uhr.",
+    "[red,bold]warn[/] queue is backing up",
+    # Too long to carry in a component's custom_id, so menus keep it in memory until Submit
+    "Reminder: the community event starts Saturday at 18:00 UTC. Bring your own snacks and "
+    "check the pinned message for the full schedule.",
+)
+
+class LoadContext:
+    def __init__(self, session: aiohttp.ClientSession, standin: DiscordStandIn, users: int, guilds: int):
+        self.session = session
+        self.standin = standin
+        self.base_url = standin.base_url
+        self.users = users
+        self.guilds = guilds
+        self.random = random.Random(0)
+
+    def interaction(self, opener: Optional[FakeInteraction] = None, **kwargs) -> FakeInteraction:
+        # Clicks on a menu come from the user who opened it
+        return FakeInteraction(
+            self.session,
+            self.base_url,
+            user_id=opener.user.id if opener else self.random.randrange(self.users),
+            guild_id=opener.guild_id if opener else self.random.randrange(self.guilds),
+            **kwargs
+        )
+
+    def text(self) -> str:
+        return self.random.choice(SAMPLE_TEXTS)
+
+    def message(self) -> FakeMessage:
+        return self.standin.add_message(self.text(), channel_id=self.random.randrange(1000))
+
+async def _click(ctx: LoadContext, opener: FakeInteraction, item, message: FakeMessage,
+                 values=None) -> FakeInteraction:
+    # Same path discord.py takes for a dynamic item: rebuilt from its custom_id, then called
+    interaction = ctx.interaction(opener, is_component=True, message=message)
+    match = item.template.fullmatch(item.custom_id)
+    clicked = await type(item).from_custom_id(interaction, item.item, match)
+    if values is not None:
+        clicked._refresh_state(interaction, {"values": values})
+    await clicked.callback(interaction)
+    return interaction
+
+async def run_chroma(ctx: LoadContext, record):
+    from discord import app_commands
+    from commands.chroma import chroma_command
+    interaction = ctx.interaction()
+    await chroma_command.callback(
+        interaction, ctx.text(),
+        app_commands.Choice(name="Bold", value=1),
+        app_commands.Choice(name="Indigo", value=45),
+        app_commands.Choice(name="Cyan", value=36),
+        inline_styles=app_commands.Choice(name="Yes", value="yes")
+    )
+    record("chroma", interaction)
+
+async def run_random(ctx: LoadContext, record):
+    from discord import app_commands
+    from commands.randomize import randomize_command
+    interaction = ctx.interaction()
+    mode = ctx.random.choice((None, app_commands.Choice(name="Rainbow", value="rainbow")))
+    await randomize_command.callback(interaction, ctx.text(), None, mode)
+    record("random", interaction)
+
+async def run_translate(ctx: LoadContext, record):
+    from discord import app_commands
+    from commands.translate import translate_command
+    interaction = ctx.interaction()
+    language = ctx.random.choice(("es", "fr", "de", "ja"))
+    await translate_command.callback(interaction, ctx.text(), app_commands.Choice(name=language, value=language))
+    record("translate", interaction)
+
+async def run_translate_many(ctx: LoadContext, record):
+    from commands.translate_many import translate_many_command
+    interaction = ctx.interaction()
+    await translate_many_command.callback(interaction, ctx.text(), "es, fr, de, it, pt")
+    record("translate_many", interaction)
+
+async def run_translate_history(ctx: LoadContext, record):
+    from discord import app_commands
+    from commands.translate_history import translate_history_command
+    # A busy channel: mostly people, some bots, some repeats
+    channel_id = ctx.random.randrange(1 << 40)
+    for i in range(60):
+        author = FakeUser(ctx.random.randrange(ctx.users), bot=i % 10 == 0)
+        last = ctx.standin.add_message(f"{ctx.text()} #{i % 40}", channel_id, author)
+    # Other people's messages can only be read with the Message Content intent
+    interaction = ctx.interaction(message=last, message_content=True)
+    await translate_history_command.callback(
+        interaction, app_commands.Choice(name="Spanish", value="es"), count=50
+    )
+    record("translate_history", interaction)
+
+async def run_colorize_menu(ctx: LoadContext, record):
+    from commands.context_menus.colorize import colorize_context_menu
+    message = ctx.message()
+    menu = ctx.interaction()
+    await colorize_context_menu.callback(menu, message)
+    record("colorize_menu", menu)
+
+    click = await _click(ctx, menu, menu.sent_view.children[1], message, ["45"])
+    record("colorize_select", click)
+    submit = await _click(ctx, menu, click.sent_view.submit_button, message)
+    record("colorize_submit", submit)
+
+async def run_translate_menu(ctx: LoadContext, record):
+    from commands.context_menus.translate import translate_context_menu
+    message = ctx.message()
+    menu = ctx.interaction()
+    await translate_context_menu.callback(menu, message)
+    record("translate_menu", menu)
+
+    view = menu.sent_view
+    # Half the users keep the preselected language, so Submit picks up the speculative translation
+    if ctx.random.random() < 0.5:
+        click = await _click(ctx, menu, view.children[0], message, [ctx.random.choice(("es", "fr", "de"))])
+        record("translate_select", click)
+        view = click.sent_view
+    submit = await _click(ctx, menu, view.submit_button, message)
+    record("translate_submit", submit)
+
+SCENARIOS = {
+    "chroma": run_chroma,
+    "random": run_random,
+    "translate": run_translate,
+    "translate_many": run_translate_many,
+    "translate_history": run_translate_history,
+    "colorize_menu": run_colorize_menu,
+    "translate_menu": run_translate_menu,
+}
+
+class Stats:
+    def __init__(self):
+        self.acks = defaultdict(list)
+        self.followups = defaultdict(list)
+        self.missed = Counter()
+        self.errors = Counter()
+        self.completed = 0
+
+    def record(self, name: str, interaction: FakeInteraction):
+        recorder = interaction.recorder
+        if recorder.acked is None:
+            self.errors[f"{name}: never acknowledged"] += 1
+            return
+        ack = recorder.acked - recorder.created
+        self.acks[name].append(ack)
+        if ack > ACK_DEADLINE:
+            self.missed[name] += 1
+        if recorder.followups:
+            self.followups[name].append(recorder.followups[-1] - recorder.created)
+        if recorder.error_replies:
+            self.errors[f"{name}: error reply"] += recorder.error_replies
+
+def _parse_mix(value: str) -> dict:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+async def run_load(rate: float, duration: float, mix: dict, ctx: LoadContext) -> tuple:
+    stats = Stats()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    tasks = []
+
+    async def one(name: str):
+        try:
+            await SCENARIOS[name](ctx, stats.record)
+            stats.completed += 1
+        except Exception as e:
+            stats.errors[f"{name}: {type(e).__name__}"] += 1
+
+    start = time.perf_counter()
+    total = int(rate * duration)
+    for i in range(total):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(one(ctx.random.choices(names, weights)[0])))
+    await asyncio.gather(*tasks)
+    return stats, time.perf_counter() - start
+
+def report(rate: float, stats: Stats, elapsed: float):
+    print(f"\n== offered {rate:.0f} interactions/s, {stats.completed} scenarios in {elapsed:.1f}s ==")
+    print(f"{'handler':<20}{'count':>8}{'ack p50':>10}{'ack p99':>10}{'followup p50':>14}{'followup p99':>14}{'missed 3s':>11}")
+    for name in sorted(stats.acks):
+        acks = stats.acks[name]
+        followups = stats.followups.get(name)
+        fp50 = f"{percentile(followups, 50) * 1000:.1f}ms" if followups else "-"
+        fp99 = f"{percentile(followups, 99) * 1000:.1f}ms" if followups else "-"
+        print(
+            f"{name:<20}{len(acks):>8}{percentile(acks, 50) * 1000:>8.1f}ms{percentile(acks, 99) * 1000:>8.1f}ms"
+            f"{fp50:>14}{fp99:>14}{stats.missed[name]:>11}"
+        )
+    for error, count in stats.errors.most_common():
+        print(f"  error {error}: {count}")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=100.0, help="Interactions started per second")
+    parser.add_argument("--sweep", help="Comma-separated rates to run one after another")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per rate")
+    parser.add_argument("--mix", default=",".join(SCENARIOS), help="Scenarios and weights, e.g. chroma=3,translate=1")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--discord-latency-ms", type=float, default=30.0, help="Latency of the Discord stand-in")
+    parser.add_argument("--fake-latency-ms", type=float, default=150.0, help="Latency of the fake translation backend")
+    parser.add_argument("--fake-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    # Fully offline: the translation stack picks these up when it is first used
+    os.environ["TRANSLATION_BACKEND"] = "fake"
+    os.environ["FAKE_TRANSLATION_LATENCY_MS"] = str(args.fake_latency_ms)
+    os.environ["FAKE_TRANSLATION_ERROR_RATE"] = str(args.fake_error_rate)
+    from utils.translator import close_translator
+
+    mix = _parse_mix(args.mix)
+    rates = [float(rate) for rate in args.sweep.split(",")] if args.sweep else [args.rate]
+    standin = DiscordStandIn(latency_ms=args.discord_latency_ms)
+    await standin.start()
+    connector = aiohttp.TCPConnector(limit=0)
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            for rate in rates:
+                ctx = LoadContext(session, standin, args.users, args.guilds)
+                stats, elapsed = await run_load(rate, args.duration, mix, ctx)
+                report(rate, stats, elapsed)
+                # Each rate starts with a cold cache and an empty queue
+                await close_translator()
+    finally:
+        await standin.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+import json
+import math
+import os
+import ssl
+import subprocess
+import tempfile
+import time
+import asyncio
+from aiohttp import web
+
+# A local stand-in for the Google Translate web endpoints used by googletrans.
+# It serves HTTPS with a throwaway self-signed certificate, so clients pay the
+# same connection and TLS setup costs they would against the real service.
+
+def _self_signed_context(directory: str) -> ssl.SSLContext:
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=127.0.0.1", "-keyout", key, "-out", cert],
+        check=True, capture_output=True
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    return context
+
+class TranslateStandIn:
+    """
+    HTTPS server answering googletrans' token page and translate_a/single requests.
+    Translations are the upper-cased query, detected source is always "en".
+    """
+    def __init__(self, latency_ms: float = 0.0, port: int = 0):
+        self.latency = latency_ms / 1000.0
+        self.port = port
+        self.requests = 0
+        self._runner = None
+        self._tmpdir = None
+
+    async def _token_page(self, request: web.Request) -> web.Response:
+        hour = math.floor(int(time.time() * 1000) / 3600000.0)
+        return web.Response(text=f"<script>tkk:'{hour}.0'</script>")
+
+    async def _translate(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        query = request.query.get("q", "")
+        payload = [[[query.upper(), query, None, None, 1]], None, "en"]
+        return web.Response(text=json.dumps(payload), content_type="application/json")
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/", self._token_page)
+        app.router.add_get("/translate_a/single", self._translate)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        self._tmpdir = tempfile.TemporaryDirectory()
+        site = web.TCPSite(self._runner, "127.0.0.1", self.port,
+                           ssl_context=_self_signed_context(self._tmpdir.name))
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return f"127.0.0.1:{self.port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+            self._tmpdir = None
@@ -0,0 +1,111 @@
+"""
+Cold-start report: how long importing the bot takes, which modules cost the most,
+and how long until the command tree is built and ready to sync. Each run is a
+fresh interpreter using `python -X importtime`.
+
+Fails when the median import time goes over --budget-ms, or when a module that
+should load lazily (googletrans, httpx by default) is imported at start-up.
+
+    python -m benchmarks.startup --runs 5 --budget-ms 750
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child: import the bot, register the commands, build the sync payload
+PROBE = """
+import json, time
+start = time.perf_counter()
+import bot
+imported = time.perf_counter()
+from utils.command_sync import tree_fingerprint
+client = bot.create_client()
+tree_fingerprint(client.tree)
+ready = time.perf_counter()
+print(json.dumps({"import": imported - start, "tree": ready - imported}))
+"""
+
+FIRST_PARTY = ("bot", "commands", "constants", "utils", "views")
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Map each module to its (self, cumulative) import time in microseconds.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not own.strip().isdigit():
+            continue
+        modules[name.strip()] = (int(own), int(cumulative))
+    return modules
+
+def run_once() -> Tuple[dict, Dict[str, Tuple[int, int]]]:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1]), parse_importtime(completed.stderr)
+
+def _is_first_party(name: str) -> bool:
+    return name.split(".")[0] in FIRST_PARTY
+
+def report(timings: List[dict], modules: Dict[str, Tuple[int, int]], top: int):
+    import_ms = [t["import"] * 1000 for t in timings]
+    tree_ms = [t["tree"] * 1000 for t in timings]
+    print(f"runs: {len(timings)}")
+    print(f"import bot:        median {statistics.median(import_ms):8.1f}ms  min {min(import_ms):8.1f}ms")
+    print(f"commands ready:    median {statistics.median(tree_ms):8.1f}ms  min {min(tree_ms):8.1f}ms")
+    print(f"modules imported:  {len(modules)}")
+
+    print("\nslowest modules by cumulative time (last run):")
+    ranked = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (own, cumulative) in ranked[:top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {own / 1000:7.1f}ms self  {name}")
+
+    print("\nfirst-party modules by self time (last run):")
+    ours = sorted(((n, t) for n, t in modules.items() if _is_first_party(n)), key=lambda item: item[1][0], reverse=True)
+    for name, (own, cumulative) in ours[:top]:
+        print(f"  {own / 1000:8.1f}ms self  {cumulative / 1000:7.1f}ms total  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start")
+    parser.add_argument("--top", type=int, default=15, help="Modules to list")
+    parser.add_argument("--budget-ms", type=float, default=750.0, help="Max median import time of bot.py")
+    parser.add_argument("--forbid", default="googletrans,httpx",
+                        help="Comma-separated modules that must not be imported at start-up")
+    args = parser.parse_args()
+
+    timings = []
+    modules = {}
+    for _ in range(max(1, args.runs)):
+        timing, modules = run_once()
+        timings.append(timing)
+    report(timings, modules, args.top)
+
+    failures = []
+    median_ms = statistics.median(t["import"] for t in timings) * 1000
+    if median_ms > args.budget_ms:
+        failures.append(f"import time {median_ms:.1f}ms is over the {args.budget_ms:.0f}ms budget")
+    for name in filter(None, (item.strip() for item in args.forbid.split(","))):
+        if name in modules:
+            failures.append(f"{name} is imported at start-up")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nOK: within the import budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Microbenchmarks for the rendering and translation paths.
+
+    python -m benchmarks.suite                    # run and compare with the baseline
+    python -m benchmarks.suite --update-baseline  # store this run as the new baseline
+    python -m benchmarks.suite --filter translate --fake-latency-ms 20 --fake-error-rate 0.05
+
+Exits with status 1 when a benchmark's throughput drops more than --threshold
+below the stored baseline, and still does on --retries fresh runs. The baseline
+is the median of --runs runs.
+"""
+import argparse
+import asyncio
+import os
+import platform
+import sys
+from benchmarks.harness import (bench_async, bench_sync, best_results, find_regressions, load_baseline,
+                                median_results, print_table, save_baseline)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Tiny up to just under Discord's 2000 character limit
+MESSAGE_SIZES = {"tiny": 8, "small": 120, "medium": 600, "max": 1900}
+WORDS = ("status", "deploy", "green", "warning", "queue", "shard", "ready", "latency")
+
+def make_message(size: int, seed: int = 0) -> str:
+    words = []
+    length = 0
+    i = seed
+    while length < size:
+        word = WORDS[i % len(WORDS)]
+        words.append(word)
+        length += len(word) + 1
+        i += 1
+    return " ".join(words)[:size]
+
+def _english(size: int) -> str:
+    sentence = "Server maintenance starts in ten minutes, please save your work and log out. "
+    return (sentence * (size // len(sentence) + 1))[:size]
+
+def _variants(size: int, count: int = 4096) -> list:
+    # More distinct messages than the render memo holds, so every call renders
+    base = make_message(size)
+    return [base[:-6] + f"{i:06d}" if size > 6 else f"{i:0{size}d}"[-size:] for i in range(count)]
+
+def rendering_benchmarks(duration: float) -> list:
+    from utils.ansi_format import build_ansi_response, build_ansi_messages, randomize_format, randomize_messages
+
+    results = []
+    for label, size in MESSAGE_SIZES.items():
+        messages = _variants(size)
+        results.append(bench_sync(
+            f"build_ansi_response[{label}]",
+            lambda i: build_ansi_response(messages[i % len(messages)], 1, 31, 40),
+            duration
+        ))
+        results.append(bench_sync(
+            f"randomize_format[{label}]",
+            lambda i: randomize_format(messages[i % len(messages)], True),
+            duration
+        ))
+    message = make_message(MESSAGE_SIZES["small"])
+    results.append(bench_sync(
+        "build_ansi_response[memo hit]",
+        lambda i: build_ansi_response(message, 1, 31, 40),
+        duration
+    ))
+    markup = ("[red,bold]warn[/] ok [bg:indigo]" + make_message(40) + "[/] ") * 20
+    results.append(bench_sync(
+        "build_ansi_messages[markup]",
+        lambda i: build_ansi_messages(markup, 0, 32, 40, markup=True),
+        duration
+    ))
+    long_message = make_message(MESSAGE_SIZES["max"])
+    for mode in ("rainbow", "gradient"):
+        results.append(bench_sync(
+            f"randomize_messages[{mode},max]",
+            lambda i, mode=mode: randomize_messages(long_message, False, mode),
+            duration
+        ))
+    return results
+
+async def translation_benchmarks(duration: float, latency_ms: float, error_rate: float) -> list:
+    # The scheduler would throttle the benchmark itself
+    os.environ["TRANSLATION_RATE_LIMIT"] = "0"
+    # Measure the upstream path; local answers get their own benchmarks below
+    os.environ["TRANSLATION_LANGID"] = "0"
+    os.environ["TRANSLATION_MEMORY"] = "0"
+    from utils import translator
+    from utils.backends import FakeBackend
+    from utils.langid import detect_language
+
+    results = []
+    for label, size in MESSAGE_SIZES.items():
+        await translator.close_translator()
+        translator.open_translator(FakeBackend(latency=latency_ms / 1000.0, error_rate=error_rate))
+        messages = _variants(size, 100000)
+        results.append(await bench_async(
+            f"translate_text[miss,{label}]",
+            lambda i: translator.translate_text(messages[i % len(messages)], "es"),
+            duration
+        ))
+        hot = make_message(size)
+        results.append(await bench_async(
+            f"translate_text[hit,{label}]",
+            lambda i: translator.translate_text(hot, "es"),
+            duration
+        ))
+
+    await translator.close_translator()
+    translator.open_translator(FakeBackend(latency=latency_ms / 1000.0, error_rate=error_rate))
+    messages = _variants(MESSAGE_SIZES["small"], 100000)
+    results.append(await bench_async(
+        "translate_text[miss,small,x50]",
+        lambda i: translator.translate_text(messages[i % len(messages)], "es"),
+        duration,
+        concurrency=50
+    ))
+
+    for label, size in (("small", MESSAGE_SIZES["small"]), ("max", MESSAGE_SIZES["max"])):
+        english = [f"{text} ({i})" for i, text in enumerate([_english(size)] * 4096)]
+        results.append(bench_sync(
+            f"detect_language[{label}]",
+            lambda i: detect_language(english[i % len(english)]),
+            duration
+        ))
+    os.environ["TRANSLATION_LANGID"] = "1"
+    english = [f"{_english(MESSAGE_SIZES['small'])} #{i}" for i in range(100000)]
+    results.append(await bench_async(
+        "translate_text[same language,small]",
+        lambda i: translator.translate_text(english[i % len(english)], "en"),
+        duration
+    ))
+
+    # Templated messages: one upstream translation, then patched from the translation memory
+    os.environ["TRANSLATION_MEMORY"] = "1"
+    await translator.translate_text("Alice reached level 1 and won 10 coins in the event.", "es")
+    results.append(await bench_async(
+        "translate_text[memory patch,small]",
+        lambda i: translator.translate_text(f"Player{i} reached level {i} and won {i * 10} coins in the event.", "es"),
+        duration
+    ))
+    await translator.close_translator()
+    return results
+
+async def view_benchmarks(duration: float) -> list:
+    from views.chroma_view import ColorizeState, SelectionView
+    from views.translate_view import TranslateState, TranslationView
+
+    # Views are rebuilt from their custom_ids on every select change, so this is per click
+    async def selection_view(i):
+        SelectionView(ColorizeState(1, 45, 36, bool(i % 2), f"#{1000 + i}"))
+
+    async def translation_view(i):
+        TranslationView(TranslateState("es", f"#{1000 + i}"))
+
+    return [
+        await bench_async("SelectionView()", selection_view, duration),
+        await bench_async("TranslationView()", translation_view, duration)
+    ]
+
+async def run(args) -> list:
+    results = []
+    if "render" in args.groups:
+        results += rendering_benchmarks(args.duration)
+    if "translate" in args.groups:
+        results += await translation_benchmarks(args.duration, args.fake_latency_ms, args.fake_error_rate)
+    if "views" in args.groups:
+        results += await view_benchmarks(args.duration)
+    if args.filter:
+        results = [result for result in results if args.filter in result["name"]]
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds per benchmark, split into rounds")
+    parser.add_argument("--groups", nargs="+", default=["render", "translate", "views"],
+                        choices=["render", "translate", "views"])
+    parser.add_argument("--filter", help="Only keep benchmarks whose name contains this")
+    parser.add_argument("--fake-latency-ms", type=float, default=0.0, help="Latency of the fake translation backend")
+    parser.add_argument("--fake-error-rate", type=float, default=0.0, help="Error rate (0-1) of the fake translation backend")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed throughput drop before failing")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--runs", type=int, default=3, help="Runs whose median is stored by --update-baseline")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Fresh runs that must confirm a regression before failing")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        results = median_results([asyncio.run(run(args)) for _ in range(max(1, args.runs))])
+    else:
+        results = asyncio.run(run(args))
+        # A slow spell on a shared machine can last a whole benchmark; a real regression
+        # shows up again on a fresh run, so only the best of the runs is compared
+        runs = [results]
+        for _ in range(args.retries):
+            regressions = find_regressions(results, baseline, args.threshold)
+            if not regressions:
+                break
+            print(f"{len(regressions)} below the threshold, confirming on a fresh run...")
+            runs.append(asyncio.run(run(args)))
+            results = best_results(runs)
+    print_table(results, baseline)
+
+    if args.update_baseline:
+        merged = dict(baseline)
+        merged.update({result["name"]: result for result in results})
+        save_baseline(args.baseline, list(merged.values()), {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "fake_latency_ms": args.fake_latency_ms,
+            "fake_error_rate": args.fake_error_rate
+        })
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
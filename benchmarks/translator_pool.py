@@ -0,0 +1,76 @@
+"""
+Compare translation latency with a new googletrans client per call (the old
+behaviour) against the shared pooled client, using a local HTTPS stand-in.
+
+    python -m benchmarks.translator_pool --requests 300 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from googletrans import Translator
+from benchmarks.harness import percentile
+from benchmarks.standin import TranslateStandIn
+from utils.backends import GoogleTransBackend
+
+async def per_call(host: str, text: str) -> None:
+    # Mirrors the old translate_text: a brand new client for every request
+    translator = Translator(service_urls=[host])
+    translator.client = httpx.AsyncClient(http2=True, verify=False)
+    translator.token_acquirer.client = translator.client
+    try:
+        await translator.translate(text, dest="es")
+    finally:
+        await translator.client.aclose()
+
+_pooled_backend = None
+
+async def pooled(host: str, text: str) -> None:
+    global _pooled_backend
+    if _pooled_backend is None:
+        _pooled_backend = GoogleTransBackend(service_urls=[host], verify=False)
+    await _pooled_backend.translate(text, "es")
+
+async def run(mode, host: str, requests: int, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await mode(host, f"benchmark message {i}")
+            samples.append((time.perf_counter() - start) * 1000.0)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return samples
+
+def report(name: str, samples: list, elapsed: float):
+    print(
+        f"{name:<10} p50={percentile(samples, 50):8.2f}ms  p99={percentile(samples, 99):8.2f}ms  "
+        f"mean={statistics.mean(samples):8.2f}ms  throughput={len(samples) / elapsed:8.1f} req/s"
+    )
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Artificial upstream latency")
+    args = parser.parse_args()
+
+    standin = TranslateStandIn(latency_ms=args.latency_ms)
+    host = await standin.start()
+    try:
+        for name, mode in (("per-call", per_call), ("pooled", pooled)):
+            # Warm up once so both modes start from the same state
+            await mode(host, "warm up")
+            start = time.perf_counter()
+            samples = await run(mode, host, args.requests, args.concurrency)
+            report(name, samples, time.perf_counter() - start)
+    finally:
+        if _pooled_backend is not None:
+            await _pooled_backend.aclose()
+        await standin.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,11 @@
+import time
+
+STARTED_AT = time.perf_counter()
+
+import asyncio
 import os
+import sys
+from typing import Optional, Sequence
 import discord
 from discord import app_commands
 from dotenv import load_dotenv
@@ -6,45 +13,189 @@ from dotenv import load_dotenv
 # Import command and view setup functions
 from commands import setup_commands
 from views import setup_views
+from utils.metrics import MetricsServer, register_stats_gauges
+from utils.command_sync import sync_tree
+from utils.settings import env_bool, env_float, env_int, env_str
+from utils.translator import (
+    warm_up_translator, close_translator, translation_cache_stats, single_flight_stats,
+    batcher_stats, scheduler_stats, backend_stats, speculation_stats, local_translation_stats,
+    translation_memory_stats
+)
+
+IMPORTED_AT = time.perf_counter()
 
 # --------------------- Section: Setup and Intents ---------------------
-intents = discord.Intents.default()
-client = discord.Client(intents=intents)
-tree = app_commands.CommandTree(client)
-
-# --------------------- Section: Start-up Functions and Debugs ---------------------
-@client.event
-async def on_ready():
-    print(f'Logged in as {client.user} (ID: {client.user.id})')
-    print('------')
-    try:
-        print("Syncing commands globally...")
-        await tree.sync()
-        print("Command sync completed successfully")
-    except Exception as e:
-        print(f"Error syncing commands: {e}")
-    activity = discord.Activity(
-        type=discord.ActivityType.listening, 
-        name="/chroma"
+class ChromaClient(discord.AutoShardedClient):
+    """
+    The bot client. Runs every shard in shard_ids (all of them by default) in this
+    process. When launched as one cluster of several, only the cluster created with
+    sync_commands=True syncs the command tree, identify_gate spaces out IDENTIFYs
+    across processes, and health snapshots are put on health_queue.
+    """
+    metrics_server = None
+    force_sync = False
+    warm_up_task = None
+
+    def __init__(self, *, sync_commands: bool = True, cluster_id: Optional[int] = None,
+                 identify_gate=None, health_queue=None, **options):
+        super().__init__(**options)
+        self.tree = app_commands.CommandTree(self)
+        self.sync_commands_on_start = sync_commands
+        self.cluster_id = cluster_id
+        self.identify_gate = identify_gate
+        self.health_queue = health_queue
+        self.health_task = None
+
+    async def setup_hook(self):
+        await self.start_metrics()
+        if self.sync_commands_on_start:
+            await self.sync_commands()
+        if self.health_queue is not None:
+            self.health_task = asyncio.create_task(self.report_health_forever())
+
+    async def sync_commands(self):
+        # Runs once per process, not on every gateway reconnect, and only
+        # talks to Discord when the registered commands changed
+        guild_id = env_int("DEV_GUILD_ID", 0) or None
+        scope = f"guild {guild_id}" if guild_id else "globally"
+        try:
+            synced = await sync_tree(
+                self.tree,
+                guild_id=guild_id,
+                force=self.force_sync or env_bool("COMMAND_SYNC_FORCE", False),
+                state_path=env_str("COMMAND_SYNC_STATE", ".command_sync.json")
+            )
+            if synced:
+                print(f"Synced commands {scope}")
+            else:
+                print(f"Commands unchanged {scope}, skipped sync")
+        except Exception as e:
+            print(f"Error syncing commands: {e}")
+
+    async def start_metrics(self):
+        # Prometheus endpoint, only when METRICS_PORT is set; cluster N listens on METRICS_PORT + N
+        port = env_int("METRICS_PORT", 0)
+        if port <= 0:
+            return
+        port += self.cluster_id or 0
+        register_stats_gauges("translation_cache", translation_cache_stats)
+        register_stats_gauges("single_flight", single_flight_stats)
+        register_stats_gauges("batcher", batcher_stats)
+        register_stats_gauges("scheduler", scheduler_stats)
+        register_stats_gauges("backend", backend_stats)
+        register_stats_gauges("speculation", speculation_stats)
+        register_stats_gauges("local_translation", local_translation_stats)
+        register_stats_gauges("translation_memory", translation_memory_stats)
+        self.metrics_server = MetricsServer(env_str("METRICS_HOST", "127.0.0.1"), port)
+        await self.metrics_server.start()
+        print(f"Serving metrics on http://{self.metrics_server.host}:{port}/metrics")
+
+    async def before_identify_hook(self, shard_id: Optional[int], *, initial: bool = False):
+        if self.identify_gate is None:
+            await super().before_identify_hook(shard_id, initial=initial)
+        else:
+            await self.identify_gate.wait(shard_id)
+
+    def health(self) -> dict:
+        """
+        A snapshot of this process's shards for the launcher.
+        """
+        return {
+            "cluster": self.cluster_id,
+            "pid": os.getpid(),
+            "time": time.time(),
+            "ready": self.is_ready(),
+            "guilds": len(self.guilds),
+            "shards": {
+                shard_id: {"latency": shard.latency, "closed": shard.is_closed()}
+                for shard_id, shard in self.shards.items()
+            }
+        }
+
+    async def report_health_forever(self):
+        interval = env_float("CLUSTER_HEALTH_INTERVAL", 15.0)
+        while not self.is_closed():
+            self.report_health()
+            await asyncio.sleep(interval)
+
+    def report_health(self):
+        if self.health_queue is not None:
+            try:
+                self.health_queue.put_nowait(self.health())
+            except Exception as e:
+                print(f"Error reporting cluster health: {e}")
+
+    def warm_up(self):
+        # The translation stack loads in the background once, after the first ready
+        if self.warm_up_task is None:
+            self.warm_up_task = asyncio.create_task(warm_up_translator())
+            self.warm_up_task.add_done_callback(_report_warm_up)
+
+    # --------------------- Section: Start-up Functions and Debugs ---------------------
+    async def on_ready(self):
+        print(f'Logged in as {self.user} (ID: {self.user.id}), shards {list(self.shards)}')
+        print('------')
+        activity = discord.Activity(
+            type=discord.ActivityType.listening,
+            name="/chroma"
+        )
+        await self.change_presence(activity=activity)
+        if self.warm_up_task is None:
+            print(f"Bot is ready! Took {time.perf_counter() - STARTED_AT:.2f}s "
+                  f"({IMPORTED_AT - STARTED_AT:.2f}s importing)")
+        else:
+            print('Bot is ready!')
+        self.warm_up()
+        self.report_health()
+
+    async def close(self):
+        for task in (self.warm_up_task, self.health_task):
+            if task is not None and not task.done():
+                task.cancel()
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        await super().close()
+        await close_translator()
+
+def _report_warm_up(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Error warming up the translator: {task.exception()}")
+    elif not task.cancelled():
+        print(f"Translator warmed up {time.perf_counter() - STARTED_AT:.2f}s after start")
+
+def create_client(shard_ids: Optional[Sequence[int]] = None, shard_count: Optional[int] = None,
+                  **options) -> ChromaClient:
+    """
+    Build a client with every command and context menu registered on its tree.
+    Without shard_ids/shard_count it runs Discord's recommended number of shards.
+    Extra options go to ChromaClient (sync_commands, cluster_id, identify_gate, health_queue).
+    """
+    intents = discord.Intents.default()
+    # Privileged; lets menus re-read long messages from other users (enable it in the developer portal too)
+    intents.message_content = env_bool("MESSAGE_CONTENT_INTENT", False)
+    client = ChromaClient(
+        intents=intents,
+        shard_ids=list(shard_ids) if shard_ids is not None else None,
+        shard_count=shard_count,
+        **options
     )
-    await client.change_presence(activity=activity)
-    print('Bot is ready!')
+    setup_commands(client.tree)  # Register commands and context menus
+    setup_views(client)          # Route menu clicks to their handlers
+    return client
 
 # --------------------- Section: Token Loading ---------------------
 def main():
     load_dotenv()
     token = os.getenv("DISCORD_TOKEN")
-    
+
     if not token:
         print("Error: DISCORD_TOKEN not found in environment variables")
         return
-    
-    setup_commands(tree)       # Register commands
-    setup_views(tree, client)  # Register context menu views
 
-    client.run(token)
+    client = create_client(shard_count=env_int("SHARD_COUNT", 0) or None)
+    client.force_sync = "--force-sync" in sys.argv
 
     client.run(token)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,8 +1,15 @@
 from .chroma import register_chroma
 from .translate import register_translate
+from .translate_many import register_translate_many
+from .translate_history import register_translate_history
 from .randomize import register_randomize
+from .context_menus import register_colorize_menu, register_translate_menu
 
 def setup_commands(tree):
     register_chroma(tree)
     register_translate(tree)
-    register_randomize(tree)
\ No newline at end of file
+    register_translate_many(tree)
+    register_translate_history(tree)
+    register_randomize(tree)
+    register_colorize_menu(tree)
+    register_translate_menu(tree)
\ No newline at end of file
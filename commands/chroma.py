@@ -1,6 +1,7 @@
 from discord import app_commands, Interaction
 from constants.options import FORMAT_OPTIONS, BACKGROUND_COLORS, TEXT_COLORS
-from utils.ansi_format import build_ansi_response
+from utils.ansi_format import build_ansi_messages
+from utils.metrics import instrument
 
 @app_commands.command(name="chroma", description="🌈  Create a colorful ANSI code block")
 @app_commands.describe(
@@ -8,22 +9,29 @@ from utils.ansi_format import build_ansi_response
     format="Text formatting",
     background_color="Background color",
     text_color="Text color",
-    mobile_friendly="Mobile-friendly output"
+    mobile_friendly="Mobile-friendly output",
+    inline_styles="Style parts of the message with tags like [red,bold]text[/]"
 )
 @app_commands.choices(
     format=FORMAT_OPTIONS,
     background_color=BACKGROUND_COLORS,
     text_color=TEXT_COLORS,
-    mobile_friendly=[app_commands.Choice(name="Yes", value="yes")]
+    mobile_friendly=[app_commands.Choice(name="Yes", value="yes")],
+    inline_styles=[app_commands.Choice(name="Yes", value="yes")]
 )
+@instrument("chroma")
 async def chroma_command(interaction: Interaction, message: str,
                          format: app_commands.Choice[int],
                          background_color: app_commands.Choice[int],
                          text_color: app_commands.Choice[int],
-                         mobile_friendly: app_commands.Choice[str] = None):
+                         mobile_friendly: app_commands.Choice[str] = None,
+                         inline_styles: app_commands.Choice[str] = None):
     mobile = mobile_friendly and mobile_friendly.value == "yes"
-    response = build_ansi_response(message, format.value, text_color.value, background_color.value, mobile)
-    await interaction.response.send_message(response, ephemeral=True)
+    markup = inline_styles is not None and inline_styles.value == "yes"
+    responses = build_ansi_messages(message, format.value, text_color.value, background_color.value, mobile, markup)
+    await interaction.response.send_message(responses[0], ephemeral=True)
+    for response in responses[1:]:
+        await interaction.followup.send(response, ephemeral=True)
 
 def register_chroma(tree):
     tree.add_command(chroma_command)
@@ -0,0 +1,2 @@
+from .colorize import register_colorize_menu
+from .translate import register_translate_menu
@@ -1,7 +1,9 @@
 from discord import app_commands, Interaction, Message
 from views.chroma_view import SelectionView
+from utils.metrics import instrument
 
 @app_commands.context_menu(name="Colorize")
+@instrument("colorize_menu")
 async def colorize_context_menu(
     interaction: Interaction, 
     message: Message
@@ -10,9 +12,12 @@ async def colorize_context_menu(
     Context menu command that works on messages.
     Right-click on a message -> Apps -> Colorize.
     """
-    view = SelectionView(message.content if message.content else "Sample text")
+    view = SelectionView.for_message(message)
     await interaction.response.send_message(
-        content="Select below your format, background color, text color (and optionally, a mobile-friendly output), then click **Submit**.",
+        content="Choose format, colors, and mobile output, then click **Submit**.",
         view=view,
         ephemeral=True
     )
+
+def register_colorize_menu(tree):
+    tree.add_command(colorize_context_menu)
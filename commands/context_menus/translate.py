@@ -1,7 +1,9 @@
 from discord import app_commands, Interaction, Message
-from views.translate_view import TranslationView
+from views.translate_view import TranslationView, guess_language, speculate
+from utils.metrics import instrument
 
 @app_commands.context_menu(name="Translate")
+@instrument("translate_menu")
 async def translate_context_menu(
     interaction: Interaction,
     message: Message
@@ -9,10 +11,15 @@ async def translate_context_menu(
     """
     Context menu command for translation.
     Right-click on a message -> Apps -> Translate.
+    Translation to the most likely language starts while the user is choosing.
     """
-    view = TranslationView(message.content if message.content else "")
+    view = TranslationView.for_message(message, guess_language(interaction))
+    speculate(interaction, view.state, message.content)
     await interaction.response.send_message(
         content="Select a language to translate to, then click **Submit**.",
         view=view,
         ephemeral=True
     )
+
+def register_translate_menu(tree):
+    tree.add_command(translate_context_menu)
@@ -1,20 +1,28 @@
 from discord import app_commands, Interaction, Embed, Color
-from utils.ansi_format import randomize_format
+from constants.options import RANDOM_MODE_OPTIONS
+from utils.ansi_format import randomize_messages
+from utils.metrics import instrument
 
 @app_commands.command(name="random", description="🪅  Generate random colorful ANSI code block")
 @app_commands.describe(
     message="The message to colorize",
-    mobile_friendly="Mobile-friendly copy-paste output")
+    mobile_friendly="Mobile-friendly copy-paste output",
+    mode="Color the whole message at once, or as a rainbow or gradient")
 @app_commands.choices(
-    mobile_friendly=[app_commands.Choice(name="Yes", value="yes")])
+    mobile_friendly=[app_commands.Choice(name="Yes", value="yes")],
+    mode=RANDOM_MODE_OPTIONS)
+@instrument("random")
 async def randomize_command(
     interaction: Interaction, 
     message: str, 
-    mobile_friendly: app_commands.Choice[str] = None
+    mobile_friendly: app_commands.Choice[str] = None,
+    mode: app_commands.Choice[str] = None
     ):
     mobile_flag = (mobile_friendly is not None and mobile_friendly.value == "yes")
-    response = randomize_format(message, mobile_flag)
-    await interaction.response.send_message(response, ephemeral=True)
+    responses = randomize_messages(message, mobile_flag, mode.value if mode else None)
+    await interaction.response.send_message(responses[0], ephemeral=True)
+    for response in responses[1:]:
+        await interaction.followup.send(response, ephemeral=True)
 
 def register_randomize(tree):
     tree.add_command(randomize_command)
\ No newline at end of file
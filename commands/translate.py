@@ -1,6 +1,7 @@
 from discord import app_commands, Interaction, Embed, Color
 from constants.options import LANGUAGE_OPTIONS
 from utils.translator import translate_text
+from utils.metrics import instrument
 
 @app_commands.command(name="translate", description="🔡  Translate text to another language")
 @app_commands.describe(
@@ -8,13 +9,19 @@ from utils.translator import translate_text
     language="The language to translate to"
 )
 @app_commands.choices(language=LANGUAGE_OPTIONS)
+@instrument("translate")
 async def translate_command(
     interaction: Interaction, 
     text: str,
     language: app_commands.Choice[str]
 ):
     await interaction.response.defer(ephemeral=True)
-    result = await translate_text(text, language.value)
+    result = await translate_text(
+        text,
+        language.value,
+        user_id=interaction.user.id,
+        guild_id=interaction.guild_id
+    )
     
     if result["success"]:
         detected_language = result["src_language"]
@@ -0,0 +1,112 @@
+from typing import Optional
+import discord
+from discord import app_commands, Interaction, Embed, Color
+from constants.options import LANGUAGE_OPTIONS
+from commands.translate_many import FIELD_LIMIT, shorten
+from utils.history import MessageFilter, history_range, parse_message_ref
+from utils.settings import env_int
+from utils.translator import translate_stream
+from utils.metrics import instrument
+
+DEFAULT_COUNT = 25
+# Kept below the 6000 characters an embed holds
+PAGE_BUDGET = 5000
+PAGE_FIELDS = 10
+
+class Page:
+    """
+    One followup's worth of translated messages. full() tells when the next
+    message wouldn't fit.
+    """
+    def __init__(self, number: int, language: str):
+        self.embed = Embed(title=f"Translations ({language}) · page {number}", color=Color.blue())
+        self.size = len(self.embed.title)
+
+    def add(self, message: discord.Message, result: dict):
+        if result["success"]:
+            name = f"{message.author.display_name} ({result['src_language']})"
+            text = result["translated_text"]
+        else:
+            name = message.author.display_name
+            text = f"⚠️ Error translating: {result['error']}"
+        link = f"\n[Jump to message]({message.jump_url})"
+        value = shorten(text, FIELD_LIMIT - len(link)) + link
+        self.embed.add_field(name=shorten(name, 256), value=value, inline=False)
+        self.size += len(name) + len(value)
+
+    def full(self) -> bool:
+        return len(self.embed.fields) >= PAGE_FIELDS or self.size + FIELD_LIMIT + 256 > PAGE_BUDGET
+
+@app_commands.command(name="translate-history", description="📜  Translate the recent messages of this channel or thread")
+@app_commands.describe(
+    language="The language to translate to",
+    count=f"How many recent messages to translate (default {DEFAULT_COUNT})",
+    since="Translate everything from this message on (a message link or ID)"
+)
+@app_commands.choices(language=LANGUAGE_OPTIONS)
+@instrument("translate_history")
+async def translate_history_command(
+    interaction: Interaction,
+    language: app_commands.Choice[str],
+    count: Optional[app_commands.Range[int, 1, 500]] = None,
+    since: Optional[str] = None
+):
+    since_id = None
+    if since is not None:
+        ref = parse_message_ref(since)
+        if ref is None or (ref[0] is not None and ref[0] != interaction.channel_id):
+            await interaction.response.send_message(
+                "Error: `since` must be a link to, or the ID of, a message in this channel.",
+                ephemeral=True
+            )
+            return
+        since_id = ref[1]
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    # history -> filter -> translate (bounded, in order) -> pages, one message at a time
+    messages = MessageFilter()
+    history = history_range(
+        interaction.channel,
+        count=count if since_id is not None else count or DEFAULT_COUNT,
+        since_id=since_id,
+        limit=env_int("TRANSLATION_HISTORY_MAX", 500)
+    )
+    translations = translate_stream(
+        messages.filter(history),
+        lambda message: message.content,
+        language.value,
+        user_id=interaction.user.id,
+        guild_id=interaction.guild_id
+    )
+
+    pages = 0
+    page = None
+    try:
+        async for message, result in translations:
+            if page is None:
+                pages += 1
+                page = Page(pages, language.value)
+            page.add(message, result)
+            if page.full():
+                await interaction.followup.send(embed=page.embed, ephemeral=True)
+                page = None
+        if page is not None:
+            await interaction.followup.send(embed=page.embed, ephemeral=True)
+    except discord.Forbidden:
+        await interaction.edit_original_response(content="Error: I don't have permission to read this channel's history.")
+        return
+    except discord.HTTPException as e:
+        await interaction.edit_original_response(content=f"Error reading this channel's history: {e}")
+        return
+
+    summary = f"Translated {messages.kept} message{'s' if messages.kept != 1 else ''} to {language.name}"
+    if messages.skipped:
+        summary += (f", skipped {messages.bots} from bots, {messages.empty} without text "
+                    f"and {messages.duplicates} repeated")
+    if messages.kept == 0 and messages.empty and not interaction.client.intents.message_content:
+        summary += ". The bot needs the Message Content intent to read other people's messages"
+    await interaction.edit_original_response(content=summary + ".")
+
+def register_translate_history(tree):
+    tree.add_command(translate_history_command)
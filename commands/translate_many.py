@@ -0,0 +1,113 @@
+from typing import List, Optional, Tuple
+from discord import app_commands, Interaction, Embed, Color
+from constants.options import LANGUAGE_OPTIONS
+from utils.translator import translate_many
+from utils.metrics import instrument
+
+# Embeds hold at most 6000 characters and 1024 per field
+FIELD_LIMIT = 1024
+EMBED_BUDGET = 5500
+PENDING = "⏳ Translating..."
+
+_LANGUAGE_NAMES = {option.value: option.name for option in LANGUAGE_OPTIONS}
+_LANGUAGE_CODES = {
+    **{option.name.lower(): option.value for option in LANGUAGE_OPTIONS},
+    **{option.value: option.value for option in LANGUAGE_OPTIONS},
+    "chinese": "zh-cn",
+}
+
+def parse_languages(value: str) -> Tuple[List[str], List[str]]:
+    """
+    Split a list of language names or codes ("es, French, de", or "all") into
+    known language codes, in order and without repeats, and the unknown entries.
+    """
+    if value.strip().lower() == "all":
+        return list(_LANGUAGE_NAMES), []
+    languages, unknown = [], []
+    for entry in value.replace(";", ",").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        code = _LANGUAGE_CODES.get(entry.lower())
+        if code is None:
+            unknown.append(entry)
+        elif code not in languages:
+            languages.append(code)
+    return languages, unknown
+
+def shorten(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def build_embed(text: str, languages: List[str], results: dict,
+                src_language: Optional[str] = None) -> Embed:
+    """
+    One embed with the original text and a field per language: the translation,
+    the error for languages that failed, or a placeholder for those still running.
+    """
+    limit = min(FIELD_LIMIT, EMBED_BUDGET // (len(languages) + 1))
+    embed = Embed(title="Translations", color=Color.blue())
+    original = f"Original ({src_language})" if src_language else "Original"
+    embed.add_field(name=original, value=shorten(text, limit), inline=False)
+    for language in languages:
+        result = results.get(language)
+        if result is None:
+            value = PENDING
+        elif result["success"]:
+            value = shorten(result["translated_text"], limit)
+        else:
+            value = shorten(f"⚠️ Error translating: {result['error']}", limit)
+        embed.add_field(name=f"{_LANGUAGE_NAMES[language]} ({language})", value=value, inline=False)
+    return embed
+
+@app_commands.command(name="translate-many", description="🌐  Translate text to several languages at once")
+@app_commands.describe(
+    text="The text to translate",
+    languages="Languages to translate to, e.g. \"es, fr, de\" or \"all\""
+)
+@instrument("translate_many")
+async def translate_many_command(
+    interaction: Interaction,
+    text: str,
+    languages: str
+):
+    targets, unknown = parse_languages(languages)
+    if unknown or not targets:
+        known = ", ".join(f"{name} ({code})" for code, name in _LANGUAGE_NAMES.items())
+        problem = f"Unknown language: {', '.join(unknown)}. " if unknown else ""
+        await interaction.response.send_message(
+            f"{problem}Pick one or more of: {known}, or \"all\".",
+            ephemeral=True
+        )
+        return
+
+    await interaction.response.defer(ephemeral=True)
+    results = {}
+    src_language = None
+    message = await interaction.followup.send(embed=build_embed(text, targets, results), ephemeral=True, wait=True)
+
+    # Each batch holds every language that finished since the last edit
+    async for batch in translate_many(text, targets, user_id=interaction.user.id, guild_id=interaction.guild_id):
+        for language, result in batch:
+            results[language] = result
+            if result["success"] and src_language is None:
+                src_language = result["src_language"]
+        await message.edit(embed=build_embed(text, targets, results, src_language))
+
+@translate_many_command.autocomplete("languages")
+async def languages_autocomplete(interaction: Interaction, current: str) -> List[app_commands.Choice[str]]:
+    # Complete the last entry of the list typed so far
+    head, _, last = current.rpartition(",")
+    prefix = f"{head}, " if head else ""
+    last = last.strip().lower()
+    # Choice names and values are limited to 100 characters
+    choices = [
+        app_commands.Choice(name=f"{prefix}{name}"[:100], value=f"{prefix}{code}")
+        for code, name in _LANGUAGE_NAMES.items()
+        if (name.lower().startswith(last) or code.startswith(last)) and len(prefix) + len(code) <= 100
+    ]
+    if not head and "all".startswith(last):
+        choices.insert(0, app_commands.Choice(name="All languages", value="all"))
+    return choices[:25]
+
+def register_translate_many(tree):
+    tree.add_command(translate_many_command)
@@ -1,3 +1,3 @@
 # constants/__init__.py
-from .options import FORMAT_OPTIONS, BACKGROUND_COLORS, TEXT_COLORS, LANGUAGE_OPTIONS
-from .ui import FORMAT_UI_OPTIONS, BACKGROUND_UI_OPTIONS, TEXT_UI_OPTIONS, LANGUAGE_UI_OPTIONS
\ No newline at end of file
+from .options import FORMAT_OPTIONS, BACKGROUND_COLORS, TEXT_COLORS, LANGUAGE_OPTIONS, RANDOM_MODE_OPTIONS
+from .ui import FORMAT_UI_OPTIONS, BACKGROUND_UI_OPTIONS, TEXT_UI_OPTIONS, MOBILE_UI_OPTIONS, LANGUAGE_UI_OPTIONS
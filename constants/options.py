@@ -39,4 +39,9 @@ LANGUAGE_OPTIONS = [
     app_commands.Choice(name="Japanese", value="ja"),
     app_commands.Choice(name="Chinese (Simplified)", value="zh-cn"),
     app_commands.Choice(name="Arabic", value="ar")
+]
+
+RANDOM_MODE_OPTIONS = [
+    app_commands.Choice(name="Rainbow", value="rainbow"),
+    app_commands.Choice(name="Gradient", value="gradient")
 ]
\ No newline at end of file
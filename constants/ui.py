@@ -28,6 +28,10 @@ TEXT_UI_OPTIONS = [
     SelectOption(label="Yellow", value="33")
 ]
 
+MOBILE_UI_OPTIONS = [
+    SelectOption(label="Yes", value="yes")
+]
+
 LANGUAGE_UI_OPTIONS = [
     SelectOption(label="English", value="en"),
     SelectOption(label="Spanish", value="es"),
@@ -0,0 +1,243 @@
+"""
+Run the bot as several shard clusters, one process each.
+
+The shards (Discord's recommended count unless --shards is given) are split into
+contiguous ranges, and each range runs in its own process with an AutoShardedClient.
+Only cluster 0 syncs the command tree. IDENTIFYs are spaced out across every process
+to respect the gateway's max_concurrency, each cluster reports its shards' health
+back to this process, and clusters that die are restarted with backoff.
+
+    python launcher.py --clusters 4
+    python launcher.py --shards 16 --clusters 4
+"""
+import argparse
+import asyncio
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import List, Optional
+import aiohttp
+from dotenv import load_dotenv
+from utils.settings import env_float, env_int
+
+GATEWAY_URL = "https://discord.com/api/v10/gateway/bot"
+
+# Discord allows max_concurrency IDENTIFYs per 5 seconds, one per rate limit bucket
+IDENTIFY_INTERVAL = 5.0
+
+class IdentifyGate:
+    """
+    Spaces out IDENTIFYs from every cluster process. Shard N belongs to bucket
+    N % max_concurrency; each bucket allows one IDENTIFY per IDENTIFY_INTERVAL.
+    Built from multiprocessing primitives, so it can be handed to worker processes.
+    """
+    def __init__(self, context, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.locks = [context.Lock() for _ in range(self.max_concurrency)]
+        self.last = context.Array("d", self.max_concurrency, lock=False)
+
+    def _wait_blocking(self, bucket: int):
+        with self.locks[bucket]:
+            delay = self.last[bucket] + IDENTIFY_INTERVAL - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            self.last[bucket] = time.time()
+
+    async def wait(self, shard_id: Optional[int]):
+        bucket = (shard_id or 0) % self.max_concurrency
+        await asyncio.get_running_loop().run_in_executor(None, self._wait_blocking, bucket)
+
+def fetch_gateway(token: str) -> dict:
+    """
+    Discord's recommended shard count and session start limits for this bot.
+    """
+    async def fetch():
+        headers = {"Authorization": f"Bot {token}"}
+        async with aiohttp.ClientSession(headers=headers) as session:
+            async with session.get(GATEWAY_URL) as response:
+                response.raise_for_status()
+                return await response.json()
+    return asyncio.run(fetch())
+
+def shard_ranges(shard_count: int, clusters: int) -> List[List[int]]:
+    """
+    Split shard ids 0..shard_count-1 into `clusters` contiguous, near-equal ranges.
+    """
+    clusters = max(1, min(clusters, shard_count))
+    size = math.ceil(shard_count / clusters)
+    return [list(range(start, min(start + size, shard_count))) for start in range(0, shard_count, size)]
+
+def run_cluster(cluster_id: int, shard_ids: List[int], shard_count: int, sync_commands: bool,
+                identify_gate: IdentifyGate, health_queue, force_sync: bool):
+    """
+    Worker process entry point: run one cluster until it is told to stop.
+    """
+    from bot import create_client
+
+    token = os.environ["DISCORD_TOKEN"]
+    client = create_client(
+        shard_ids=shard_ids,
+        shard_count=shard_count,
+        sync_commands=sync_commands,
+        cluster_id=cluster_id,
+        identify_gate=identify_gate,
+        health_queue=health_queue
+    )
+    client.force_sync = force_sync
+
+    async def runner():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(client.close()))
+        async with client:
+            await client.start(token)
+
+    print(f"[cluster {cluster_id}] starting shards {shard_ids[0]}-{shard_ids[-1]} of {shard_count} (pid {os.getpid()})")
+    asyncio.run(runner())
+
+class Cluster:
+    def __init__(self, cluster_id: int, shard_ids: List[int]):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.process = None
+        self.health: Optional[dict] = None
+        self.restarts = 0
+        self.restart_at = 0.0
+
+    def describe(self, now: float, stale_after: float) -> str:
+        shards = f"{self.shard_ids[0]}-{self.shard_ids[-1]}"
+        if self.process is None or not self.process.is_alive():
+            return f"cluster {self.cluster_id:>3}  shards {shards:<9}  DOWN  restarts {self.restarts}"
+        health = self.health
+        if health is None:
+            return f"cluster {self.cluster_id:>3}  shards {shards:<9}  STARTING  pid {self.process.pid}"
+        age = now - health["time"]
+        state = "STALE" if age > stale_after else ("READY" if health["ready"] else "CONNECTING")
+        latencies = [
+            shard["latency"] for shard in health["shards"].values()
+            if not shard["closed"] and math.isfinite(shard["latency"])
+        ]
+        latency = f"{max(latencies) * 1000:.0f}ms" if latencies else "-"
+        closed = sum(1 for shard in health["shards"].values() if shard["closed"])
+        return (f"cluster {self.cluster_id:>3}  shards {shards:<9}  {state:<10}  guilds {health['guilds']:>6}  "
+                f"max latency {latency:>6}  closed shards {closed}  restarts {self.restarts}  seen {age:.0f}s ago")
+
+class Launcher:
+    def __init__(self, shard_count: int, ranges: List[List[int]], max_concurrency: int,
+                 force_sync: bool = False):
+        self.context = multiprocessing.get_context("spawn")
+        self.shard_count = shard_count
+        self.clusters = [Cluster(index, shard_ids) for index, shard_ids in enumerate(ranges)]
+        self.identify_gate = IdentifyGate(self.context, max_concurrency)
+        self.health_queue = self.context.Queue()
+        self.force_sync = force_sync
+        self.stopping = False
+        self.health_interval = env_float("CLUSTER_HEALTH_INTERVAL", 15.0)
+
+    def start(self, cluster: Cluster):
+        cluster.health = None
+        cluster.process = self.context.Process(
+            target=run_cluster,
+            name=f"chroma-cluster-{cluster.cluster_id}",
+            args=(cluster.cluster_id, cluster.shard_ids, self.shard_count, cluster.cluster_id == 0,
+                  self.identify_gate, self.health_queue, self.force_sync and cluster.restarts == 0)
+        )
+        cluster.process.start()
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def drain_health(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                report = self.health_queue.get(timeout=remaining)
+            except Exception:
+                return
+            cluster_id = report.get("cluster")
+            if cluster_id is not None and 0 <= cluster_id < len(self.clusters):
+                self.clusters[cluster_id].health = report
+
+    def restart_dead(self, now: float):
+        for cluster in self.clusters:
+            if cluster.process is None or cluster.process.is_alive():
+                continue
+            if cluster.restart_at == 0.0:
+                # Back off 5s, 10s, 20s ... up to a minute between restarts of the same cluster
+                delay = min(60.0, 5.0 * (2 ** min(cluster.restarts, 4)))
+                cluster.restart_at = now + delay
+                print(f"[launcher] cluster {cluster.cluster_id} exited with code {cluster.process.exitcode}, "
+                      f"restarting in {delay:.0f}s")
+            elif now >= cluster.restart_at:
+                cluster.restarts += 1
+                cluster.restart_at = 0.0
+                self.start(cluster)
+
+    def print_health(self, now: float):
+        print(f"[launcher] {len(self.clusters)} clusters, {self.shard_count} shards")
+        for cluster in self.clusters:
+            print(f"  {cluster.describe(now, stale_after=3 * self.health_interval)}")
+
+    def run(self):
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        for cluster in self.clusters:
+            self.start(cluster)
+
+        next_report = time.time() + self.health_interval
+        while not self.stopping:
+            self.drain_health(timeout=1.0)
+            now = time.time()
+            self.restart_dead(now)
+            if now >= next_report:
+                self.print_health(now)
+                next_report = now + self.health_interval
+        self.shutdown()
+
+    def shutdown(self):
+        print("[launcher] stopping clusters")
+        for cluster in self.clusters:
+            if cluster.process is not None and cluster.process.is_alive():
+                cluster.process.terminate()
+        for cluster in self.clusters:
+            if cluster.process is not None:
+                cluster.process.join(timeout=15)
+                if cluster.process.is_alive():
+                    cluster.process.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, default=env_int("SHARD_COUNT", 0),
+                        help="Total shard count (default: Discord's recommendation)")
+    parser.add_argument("--clusters", type=int, default=env_int("SHARD_CLUSTERS", 0),
+                        help="Worker processes (default: one per CPU core, at most one per shard)")
+    parser.add_argument("--max-concurrency", type=int, default=0,
+                        help="IDENTIFYs allowed per 5 seconds (default: from Discord)")
+    parser.add_argument("--force-sync", action="store_true", help="Sync commands even if they haven't changed")
+    args = parser.parse_args()
+
+    load_dotenv()
+    token = os.getenv("DISCORD_TOKEN")
+    if not token:
+        print("Error: DISCORD_TOKEN not found in environment variables")
+        return
+
+    shard_count = args.shards
+    max_concurrency = args.max_concurrency
+    if not shard_count or not max_concurrency:
+        gateway = fetch_gateway(token)
+        shard_count = shard_count or gateway["shards"]
+        max_concurrency = max_concurrency or gateway["session_start_limit"]["max_concurrency"]
+
+    ranges = shard_ranges(shard_count, args.clusters or os.cpu_count() or 1)
+    print(f"[launcher] {shard_count} shards in {len(ranges)} clusters, max_concurrency {max_concurrency}")
+    Launcher(shard_count, ranges, max_concurrency, force_sync=args.force_sync).run()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,25 @@
 # utils/__init__.py
-from .ansi_format import build_ansi_response, randomize_format
-from .translator import translate_text
\ No newline at end of file
+import importlib
+
+# Exported names and the submodule defining them. Submodules are imported on first
+# access, so importing one utils module doesn't load the translation stack.
+_EXPORTS = {
+    "build_ansi_response": "ansi_format",
+    "build_ansi_messages": "ansi_format",
+    "randomize_format": "ansi_format",
+    "randomize_messages": "ansi_format",
+    "translate_text": "translator",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
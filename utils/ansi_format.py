@@ -1,24 +1,214 @@
-from random import choice
+from functools import lru_cache
+from random import randrange
+from typing import List, Optional, Sequence, Tuple
+from constants.options import FORMAT_OPTIONS, BACKGROUND_COLORS, TEXT_COLORS
+from utils.ansi_markup import MarkupTemplate, compile_markup
 
-def build_ansi_response(message: str, format_value: int, text_color_value: int, background_color_value: int, mobile_friendly: bool = False) -> str:
+RESET_CODE = "\u001b[0m"
+
+# Discord's message length limit, counted in UTF-16 code units
+MESSAGE_LIMIT = 2000
+
+# Every (format, text color, background color) SGR prefix, built once at import
+STYLE_PREFIXES = {
+    (fmt.value, text.value, background.value): f"\u001b[{fmt.value};{text.value};{background.value}m"
+    for fmt in FORMAT_OPTIONS
+    for text in TEXT_COLORS
+    for background in BACKGROUND_COLORS
+}
+
+# randomize_format draws from every style except grey text
+RANDOM_STYLES = tuple(style for style in STYLE_PREFIXES if style[1] != 30)
+
+# Text colors in hue order for rainbow and gradient modes
+_TEXT_COLOR_VALUES = {choice.name: choice.value for choice in TEXT_COLORS}
+RAINBOW_PALETTE = tuple(_TEXT_COLOR_VALUES[name] for name in ("Red", "Yellow", "Green", "Cyan", "Blue", "Pink"))
+
+# Layout pieces around the colorized block
+MOBILE_HEAD = "```ansi\n"
+MOBILE_TAIL = "\n```"
+DESKTOP_HEAD = "Here's your colorized message:\n```ansi\n"
+DESKTOP_MID = "\n```\nRaw text for copy-pasting:\n\\`\\`\\`ansi\n"
+DESKTOP_TAIL = "\n\\`\\`\\`"
+
+def style_prefix(format_value: int, text_color_value: int, background_color_value: int) -> str:
+    prefix = STYLE_PREFIXES.get((format_value, text_color_value, background_color_value))
+    if prefix is None:
+        prefix = f"\u001b[{format_value};{text_color_value};{background_color_value}m"
+    return prefix
+
+def sgr_transition(current: Optional[tuple], target: tuple) -> str:
+    """
+    The shortest escape code that moves from the current style to the target one.
+    Only changed parameters are emitted. Discord has no codes to switch bold or
+    underline off, so dropping a format needs a reset followed by both colors.
+    """
+    if current is None:
+        return style_prefix(*target)
+    if current == target:
+        return ""
+    fmt, text_color, background_color = target
+    if fmt != current[0] and (fmt == 0 or current[0] != 0):
+        params = ["0", str(fmt), str(text_color), str(background_color)] if fmt else ["0", str(text_color), str(background_color)]
+    else:
+        params = []
+        if fmt != current[0]:
+            params.append(str(fmt))
+        if text_color != current[1]:
+            params.append(str(text_color))
+        if background_color != current[2]:
+            params.append(str(background_color))
+    return "\u001b[" + ";".join(params) + "m"
+
+def render_runs(runs: Sequence[Tuple[tuple, str]]) -> str:
+    """
+    Render (style, text) runs, emitting only the parameters that change between runs.
+    """
+    parts = []
+    current = None
+    for style, text in runs:
+        parts.append(sgr_transition(current, style))
+        parts.append(text)
+        current = style
+    return "".join(parts)
+
+def _utf16_length(text: str) -> int:
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-16-le")) // 2
+
+def _fit(text: str, room: int) -> int:
+    """How many characters from the start of text fit in `room` UTF-16 code units."""
+    if text.isascii() or _utf16_length(text[:room]) == room:
+        return min(len(text), room)
+    used = 0
+    for index, char in enumerate(text):
+        used += 2 if ord(char) > 0xFFFF else 1
+        if used > room:
+            return index
+    return len(text)
+
+def pack_runs(runs: Sequence[Tuple[tuple, str]], mobile_friendly: bool = False,
+              limit: int = MESSAGE_LIMIT) -> List[str]:
+    """
+    Pack styled runs into as many messages as needed to stay under Discord's limit.
+    Splits prefer a newline or space and never fall inside an escape code; each
+    message re-opens the active style, since every code block starts unstyled.
+    """
+    if mobile_friendly:
+        copies = 1
+        overhead = len(MOBILE_HEAD) + len(RESET_CODE) + len(MOBILE_TAIL)
+    else:
+        copies = 2
+        overhead = len(DESKTOP_HEAD) + len(DESKTOP_MID) + len(DESKTOP_TAIL) + 2 * len(RESET_CODE)
+    budget = (limit - overhead) // copies
+
+    messages = []
+    parts = []
+    size = 0
+    current = None
+
+    def close():
+        nonlocal parts, size, current
+        if parts:
+            messages.append(render_block("".join(parts), "", mobile_friendly))
+        parts, size, current = [], 0, None
+
+    for style, text in runs:
+        while text:
+            escape = sgr_transition(current, style)
+            room = budget - size - len(escape)
+            cut = _fit(text, room) if room > 0 else 0
+            if cut >= len(text):
+                parts.extend((escape, text))
+                size += len(escape) + _utf16_length(text)
+                current = style
+                break
+            safe = max(text.rfind("\n", 0, cut), text.rfind(" ", 0, cut))
+            if safe > 0:
+                cut = safe + 1
+            elif size:
+                # No safe split in this run; the style change before it is the boundary
+                close()
+                continue
+            if cut == 0:
+                break
+            parts.extend((escape, text[:cut]))
+            text = text[cut:]
+            close()
+    close()
+    return messages
+
+@lru_cache(maxsize=1024)
+def render_block(message: str, prefix: str, mobile_friendly: bool) -> str:
+    """
+    Render an already-styled message with the mobile or desktop layout.
+    Repeated (message, style) pairs are served from a bounded memo.
+    """
+    block = prefix + message + RESET_CODE
+    if mobile_friendly:
+        return MOBILE_HEAD + block + MOBILE_TAIL
+    return DESKTOP_HEAD + block + DESKTOP_MID + block + DESKTOP_TAIL
+
+def markup_runs(template: MarkupTemplate, base_style: tuple) -> List[Tuple[tuple, str]]:
+    """
+    Resolve compiled markup into (style, text) runs. Fields a segment doesn't set
+    come from base_style.
+    """
+    return [
+        ((
+            base_style[0] if segment.format is None else segment.format,
+            base_style[1] if segment.text_color is None else segment.text_color,
+            base_style[2] if segment.background_color is None else segment.background_color
+        ), segment.text)
+        for segment in template.segments
+    ]
+
+def render_markup(template: MarkupTemplate, base_style: tuple) -> str:
+    """
+    Render compiled markup in one pass, emitting escape codes only where the style changes.
+    """
+    return render_runs(markup_runs(template, base_style))
+
+def _message_runs(message: str, style: tuple, markup: bool) -> List[Tuple[tuple, str]]:
+    if markup and "[" in message and "]" in message:
+        template = compile_markup(message)
+        if template.has_tags:
+            return markup_runs(template, style)
+    return [(style, message)]
+
+def _fit_or_pack(response: str, runs: Sequence[Tuple[tuple, str]], mobile_friendly: bool) -> List[str]:
+    if _utf16_length(response) <= MESSAGE_LIMIT:
+        return [response]
+    return pack_runs(runs, mobile_friendly)
+
+def build_ansi_response(message: str, format_value: int, text_color_value: int, background_color_value: int, mobile_friendly: bool = False,
+                        markup: bool = False) -> str:
     """
     Build the ANSI formatted response.
     If mobile_friendly is True, only the raw ANSI code block is returned.
     Otherwise, a preview and a raw block for copy-pasting are provided.
+    With markup, inline tags such as "[red,bold]warn[/] ok" style parts of the
+    message and the rest uses the given format and colors; without it, brackets
+    are ordinary text.
     """
-    ansi_code = f"\u001b[{format_value};{text_color_value};{background_color_value}m"
-    reset_code = "\u001b[0m"
-    if mobile_friendly:
-        return f"```ansi\n{ansi_code}{message}{reset_code}\n```"
-    else:
-        return (
-            "Here's your colorized message:\n"
-            f"```ansi\n{ansi_code}{message}{reset_code}\n```\n"
-            "Raw text for copy-pasting:\n"
-            "\`\`\`ansi\n"
-            f"{ansi_code}{message}{reset_code}\n"
-            "\`\`\`"
-        )
+    if markup and "[" in message and "]" in message:
+        template = compile_markup(message)
+        if template.has_tags:
+            body = render_markup(template, (format_value, text_color_value, background_color_value))
+            return render_block(body, "", bool(mobile_friendly))
+    prefix = style_prefix(format_value, text_color_value, background_color_value)
+    return render_block(message, prefix, bool(mobile_friendly))
+
+def build_ansi_messages(message: str, format_value: int, text_color_value: int, background_color_value: int, mobile_friendly: bool = False,
+                        markup: bool = False) -> List[str]:
+    """
+    Same as build_ansi_response, split into several messages when the result
+    would go over Discord's 2000 character limit.
+    """
+    response = build_ansi_response(message, format_value, text_color_value, background_color_value, mobile_friendly, markup)
+    runs = _message_runs(message, (format_value, text_color_value, background_color_value), markup)
+    return _fit_or_pack(response, runs, bool(mobile_friendly))
 
 def randomize_format(message: str, mobile_friendly: bool = False) -> str:
     '''
@@ -26,20 +216,53 @@ def randomize_format(message: str, mobile_friendly: bool = False) -> str:
     If mobile_friendly is True, only the raw ANSI code block is returned.
     Otherwise, a preview and a raw block for copy-pasting are provided.
     '''
-    format_value = choice([0, 1, 4])
-    text_color_value = choice([31, 32, 33, 34, 35, 36, 37])
-    background_color_value = choice([40, 41, 42, 43, 44, 45, 46, 47])
+    style = RANDOM_STYLES[randrange(len(RANDOM_STYLES))]
+    return render_block(message, STYLE_PREFIXES[style], bool(mobile_friendly))
 
-    ansi_code = f"\u001b[{format_value};{text_color_value};{background_color_value}m"
-    reset_code = "\u001b[0m"
-    if mobile_friendly:
-        return f"```ansi\n{ansi_code}{message}{reset_code}\n```"
+def rainbow_runs(message: str, mode: str, format_value: int, background_color_value: int,
+                 offset: int = 0) -> List[Tuple[tuple, str]]:
+    """
+    Split a message into (style, text) runs that cycle through RAINBOW_PALETTE.
+    "rainbow" changes color on every visible character, "gradient" spreads the
+    palette over the message in contiguous bands. Whitespace keeps the previous
+    style so neighbouring runs merge.
+    """
+    palette = RAINBOW_PALETTE
+    visible = sum(1 for char in message if not char.isspace())
+    runs = []
+    pieces = []
+    current = None
+    index = 0
+    for char in message:
+        if not char.isspace() or current is None:
+            if mode == "gradient":
+                color = palette[(offset + index * len(palette) // max(visible, 1)) % len(palette)]
+            else:
+                color = palette[(offset + index) % len(palette)]
+            style = (format_value, color, background_color_value)
+            if not char.isspace():
+                index += 1
+            if style != current:
+                if pieces:
+                    runs.append((current, "".join(pieces)))
+                pieces = []
+                current = style
+        pieces.append(char)
+    if pieces:
+        runs.append((current, "".join(pieces)))
+    return runs
+
+def randomize_messages(message: str, mobile_friendly: bool = False, mode: Optional[str] = None) -> List[str]:
+    """
+    Randomized response split to fit Discord's limit. mode "rainbow" or "gradient"
+    colors the message with the rainbow palette over a random format and background;
+    otherwise the whole message gets one random style, like randomize_format.
+    """
+    fmt, text_color, background_color = RANDOM_STYLES[randrange(len(RANDOM_STYLES))]
+    if mode in ("rainbow", "gradient"):
+        runs = rainbow_runs(message, mode, fmt, background_color, offset=randrange(len(RAINBOW_PALETTE)))
+        response = render_block(render_runs(runs), "", bool(mobile_friendly))
     else:
-        return (
-            "Here's your colorized message:\n"
-            f"```ansi\n{ansi_code}{message}{reset_code}\n```\n"
-            "Raw text for copy-pasting:\n"
-            "\`\`\`ansi\n"
-            f"{ansi_code}{message}{reset_code}\n"
-            "\`\`\`"
-        )
\ No newline at end of file
+        runs = [((fmt, text_color, background_color), message)]
+        response = render_block(message, STYLE_PREFIXES[runs[0][0]], bool(mobile_friendly))
+    return _fit_or_pack(response, runs, bool(mobile_friendly))
@@ -0,0 +1,102 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+from constants.options import FORMAT_OPTIONS, BACKGROUND_COLORS, TEXT_COLORS
+
+def _name_key(name: str) -> str:
+    return re.sub(r"[\s_\-]", "", name.lower())
+
+# Tag names accepted in markup, e.g. "bold", "red", "bg:dark blue"
+FORMAT_NAMES = {_name_key(choice.name): choice.value for choice in FORMAT_OPTIONS}
+TEXT_COLOR_NAMES = {_name_key(choice.name): choice.value for choice in TEXT_COLORS}
+BACKGROUND_NAMES = {_name_key(choice.name): choice.value for choice in BACKGROUND_COLORS}
+for _names in (TEXT_COLOR_NAMES, BACKGROUND_NAMES):
+    for _key, _value in list(_names.items()):
+        if "grey" in _key:
+            _names[_key.replace("grey", "gray")] = _value
+
+BACKGROUND_PREFIXES = ("bg:", "bg=", "on ")
+
+# "[red,bold]" opens a style, "[/]" closes the innermost one
+TAG_PATTERN = re.compile(r"\[(/|[A-Za-z0-9 _:=,\-]{1,60})\]")
+
+class Segment(NamedTuple):
+    """
+    A run of text and the style fields set by its enclosing tags.
+    None means "use the base style chosen in the command or menu".
+    """
+    format: Optional[int]
+    text_color: Optional[int]
+    background_color: Optional[int]
+    text: str
+
+class MarkupTemplate(NamedTuple):
+    segments: Tuple[Segment, ...]
+    has_tags: bool
+
+def parse_tag(body: str) -> Optional[tuple]:
+    """
+    Parse the inside of a tag into a (format, text color, background) override.
+    Returns None if any part isn't a known style, so the tag is kept as literal text.
+    """
+    fmt = text_color = background_color = None
+    for part in body.split(","):
+        part = part.strip().lower()
+        if not part:
+            return None
+        background = next((part[len(p):] for p in BACKGROUND_PREFIXES if part.startswith(p)), None)
+        if background is not None:
+            background_color = BACKGROUND_NAMES.get(_name_key(background))
+            if background_color is None:
+                return None
+            continue
+        key = _name_key(part)
+        if key in FORMAT_NAMES:
+            fmt = FORMAT_NAMES[key]
+        elif key in TEXT_COLOR_NAMES:
+            text_color = TEXT_COLOR_NAMES[key]
+        else:
+            return None
+    return fmt, text_color, background_color
+
+@lru_cache(maxsize=512)
+def compile_markup(template: str) -> MarkupTemplate:
+    """
+    Tokenize a markup template in a single pass into styled segments.
+    Tags nest, inner tags override only the fields they set, unclosed tags run to
+    the end, and anything that isn't a valid tag is kept as literal text.
+    Compiled templates are cached, so repeated templates skip parsing.
+    """
+    stack = [(None, None, None)]
+    segments = []
+    has_tags = False
+    position = 0
+
+    def flush(end: int):
+        if end <= position:
+            return
+        style = stack[-1]
+        # Adjacent runs with the same style are merged; pieces are joined once at the end
+        if segments and segments[-1][0] == style:
+            segments[-1][1].append(template[position:end])
+        else:
+            segments.append((style, [template[position:end]]))
+
+    for match in TAG_PATTERN.finditer(template):
+        body = match.group(1)
+        if body == "/":
+            if len(stack) == 1:
+                continue
+            flush(match.start())
+            stack.pop()
+        else:
+            override = parse_tag(body)
+            if override is None:
+                continue
+            flush(match.start())
+            current = stack[-1]
+            stack.append(tuple(new if new is not None else old for new, old in zip(override, current)))
+        has_tags = True
+        position = match.end()
+    flush(len(template))
+    return MarkupTemplate(tuple(Segment(*style, "".join(pieces)) for style, pieces in segments), has_tags)
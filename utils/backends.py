@@ -0,0 +1,208 @@
+import asyncio
+import importlib
+import random
+from typing import Callable, Dict, List, Optional, Protocol, Sequence
+from utils.resilience import TranslationError
+from utils.settings import env_int, env_float
+
+# Joins single-line texts in an upstream batch; the translation keeps one line per text
+BATCH_SEPARATOR = "\n"
+
+class TranslationBackend(Protocol):
+    """
+    What translate_text needs from an upstream translation service.
+    Results are dicts with translated_text, src_language and dest_language.
+    """
+    name: str
+
+    async def translate(self, text: str, dest_language: str) -> dict: ...
+
+    async def translate_batch(self, texts: List[str], dest_language: str) -> List[dict]: ...
+
+    async def aclose(self) -> None: ...
+
+class GoogleTransBackend:
+    """
+    googletrans with one pooled httpx client reused for every request, so requests
+    skip connection and TLS setup. Tunables: TRANSLATOR_POOL_SIZE, TRANSLATOR_KEEPALIVE
+    (seconds idle before a pooled connection is dropped) and TRANSLATOR_TIMEOUT
+    (seconds per request).
+    """
+    name = "googletrans"
+
+    def __init__(self, pool_size: Optional[int] = None, keepalive: Optional[float] = None,
+                 timeout: Optional[float] = None, service_urls: Optional[Sequence[str]] = None,
+                 verify: bool = True):
+        if pool_size is None:
+            pool_size = env_int("TRANSLATOR_POOL_SIZE", 20)
+        if keepalive is None:
+            keepalive = env_float("TRANSLATOR_KEEPALIVE", 30.0)
+        if timeout is None:
+            timeout = env_float("TRANSLATOR_TIMEOUT", 10.0)
+
+        # Imported here so the bot starts without loading googletrans, httpx and h2
+        import httpx
+        from googletrans import Translator
+        from googletrans.constants import DEFAULT_CLIENT_SERVICE_URLS
+
+        # raise_exception makes HTTP errors raise instead of echoing the input back
+        translator = Translator(service_urls=service_urls or DEFAULT_CLIENT_SERVICE_URLS, raise_exception=True)
+        # googletrans doesn't expose pool limits, so swap in a client configured for them
+        translator.client = httpx.AsyncClient(
+            http2=True,
+            verify=verify,
+            headers=translator.client.headers,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=keepalive
+            )
+        )
+        translator.token_acquirer.client = translator.client
+        self.translator = translator
+
+    @staticmethod
+    def _as_translation(result) -> dict:
+        return {
+            "translated_text": result.text,
+            "src_language": result.src,
+            "dest_language": result.dest
+        }
+
+    async def translate(self, text: str, dest_language: str) -> dict:
+        return self._as_translation(await self.translator.translate(text, dest=dest_language))
+
+    async def _translate_joined(self, texts: List[str], dest_language: str,
+                                language: str) -> Optional[List[dict]]:
+        # One request for texts that look like the same language; None unless the
+        # reply splits back into one line per text and upstream agrees on the source
+        result = await self.translator.translate(BATCH_SEPARATOR.join(texts), dest=dest_language)
+        lines = result.text.split(BATCH_SEPARATOR)
+        if len(lines) != len(texts) or result.src != language:
+            return None
+        return [
+            {"translated_text": line.strip(), "src_language": result.src, "dest_language": result.dest}
+            for line in lines
+        ]
+
+    async def translate_batch(self, texts: List[str], dest_language: str) -> List[dict]:
+        """
+        Translate several single-line texts, joining the ones confidently detected as the
+        same language into one upstream request. Upstream detects a single source for a
+        joined request, so texts in other or unknown languages, and groups whose reply
+        doesn't split back line by line, are translated individually instead.
+        """
+        from utils.langid import detect_language
+
+        confidence = env_float("TRANSLATION_LANGID_CONFIDENCE", 0.9)
+        groups: Dict[Optional[str], List[int]] = {}
+        for index, text in enumerate(texts):
+            detection = detect_language(text)
+            language = detection.language if detection.confidence >= confidence else None
+            groups.setdefault(language, []).append(index)
+
+        results: List[Optional[dict]] = [None] * len(texts)
+        individual = groups.pop(None, [])
+        for language, indexes in groups.items():
+            joined = None
+            if len(indexes) > 1:
+                joined = await self._translate_joined([texts[i] for i in indexes], dest_language, language)
+            if joined is None:
+                individual.extend(indexes)
+                continue
+            for index, translation in zip(indexes, joined):
+                results[index] = translation
+
+        if len(individual) == 1:
+            results[individual[0]] = await self.translate(texts[individual[0]], dest_language)
+        elif individual:
+            items = await self.translator.translate([texts[i] for i in individual], dest=dest_language)
+            for index, item in zip(individual, items):
+                results[index] = self._as_translation(item)
+        return results
+
+    async def aclose(self):
+        await self.translator.client.aclose()
+
+class FakeBackend:
+    """
+    Deterministic local backend for tests, benchmarks and offline runs.
+    The "translation" is the text prefixed with the target language, e.g. "[es] hello".
+    Latency (seconds) and error rate are configurable; errors are drawn from a seeded RNG.
+    """
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0,
+                 src_language: str = "en"):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.src_language = src_language
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    async def _round_trip(self):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise TranslationError("Fake translation backend error")
+
+    def _translate(self, text: str, dest_language: str) -> dict:
+        return {
+            "translated_text": f"[{dest_language}] {text}",
+            "src_language": self.src_language,
+            "dest_language": dest_language
+        }
+
+    async def translate(self, text: str, dest_language: str) -> dict:
+        await self._round_trip()
+        return self._translate(text, dest_language)
+
+    async def translate_batch(self, texts: List[str], dest_language: str) -> List[dict]:
+        await self._round_trip()
+        return [self._translate(text, dest_language) for text in texts]
+
+    async def aclose(self):
+        pass
+
+def _fake_from_env() -> FakeBackend:
+    return FakeBackend(
+        latency=env_float("FAKE_TRANSLATION_LATENCY_MS", 0.0) / 1000.0,
+        error_rate=env_float("FAKE_TRANSLATION_ERROR_RATE", 0.0)
+    )
+
+BACKENDS: Dict[str, Callable[[], TranslationBackend]] = {
+    "googletrans": GoogleTransBackend,
+    "fake": _fake_from_env
+}
+
+# Heavy modules each backend imports when it is created, loaded early by preload_backend
+BACKEND_IMPORTS: Dict[str, Sequence[str]] = {
+    "googletrans": ("httpx", "googletrans")
+}
+
+def register_backend(name: str, factory: Callable[[], TranslationBackend],
+                     imports: Sequence[str] = ()):
+    """
+    Make another backend selectable through TRANSLATION_BACKEND.
+    imports lists modules the backend loads lazily, for preload_backend.
+    """
+    BACKENDS[name] = factory
+    if imports:
+        BACKEND_IMPORTS[name] = tuple(imports)
+
+def preload_backend(name: str):
+    """
+    Import the modules a backend needs without creating it. Blocking; meant to
+    run in a worker thread so the event loop keeps serving commands meanwhile.
+    """
+    for module in BACKEND_IMPORTS.get(name, ()):
+        importlib.import_module(module)
+
+def create_backend(name: str) -> TranslationBackend:
+    try:
+        factory = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown translation backend: {name}") from None
+    return factory()
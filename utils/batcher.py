@@ -0,0 +1,82 @@
+import asyncio
+from typing import Awaitable, Callable, List
+from utils.resilience import TranslationError
+
+class TranslationBatcher:
+    """
+    Collects translation requests for the same target language over a short window
+    and sends them upstream as one batch. A batch is flushed when the window expires,
+    when it reaches max_items, or when its combined text reaches max_chars.
+
+    send_batch receives (texts, dest_language) and must return one result per text,
+    in order. If it raises, or returns a different number of results, every request
+    in that batch receives the error.
+    """
+    def __init__(self, send_batch: Callable[[List[str], str], Awaitable[list]],
+                 window: float = 0.015, max_items: int = 16, max_chars: int = 4000):
+        self._send_batch = send_batch
+        self.window = window
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self._pending = {}  # dest -> list of (text, future)
+        self._pending_chars = {}
+        self._timers = {}
+        self._dispatches = set()
+
+        self.batches = 0
+        self.items = 0
+        self.full_flushes = 0
+
+    async def submit(self, text: str, dest_language: str):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._pending.setdefault(dest_language, [])
+        queue.append((text, future))
+        chars = self._pending_chars.get(dest_language, 0) + len(text)
+        self._pending_chars[dest_language] = chars
+
+        if len(queue) >= self.max_items or chars >= self.max_chars:
+            self.full_flushes += 1
+            self._flush(dest_language)
+        elif dest_language not in self._timers:
+            self._timers[dest_language] = loop.call_later(self.window, self._flush, dest_language)
+        return await future
+
+    def _flush(self, dest_language: str):
+        timer = self._timers.pop(dest_language, None)
+        if timer is not None:
+            timer.cancel()
+        self._pending_chars.pop(dest_language, None)
+        batch = self._pending.pop(dest_language, [])
+        # Requests whose caller already went away are dropped before sending
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._dispatch(dest_language, batch))
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, dest_language: str, batch: list):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self._send_batch([text for text, _ in batch], dest_language)
+            if len(results) != len(batch):
+                raise TranslationError(f"Expected {len(batch)} translations, got {len(results)}")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "full_flushes": self.full_flushes,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "fill_ratio": self.items / (self.batches * self.max_items) if self.batches else 0.0
+        }
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+import discord
+from discord import app_commands
+
+log = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = ".command_sync.json"
+
+def tree_fingerprint(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """
+    Stable hash of the commands Discord would receive for the global tree, or one guild.
+    Commands are sorted by type and name so registration order doesn't matter.
+    """
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda data: (data.get("type", 1), data["name"])
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def _load_state(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            state = json.load(file)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(path: str, state: dict):
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(state, file, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+async def sync_tree(tree: app_commands.CommandTree, guild_id: Optional[int] = None,
+                    force: bool = False, state_path: str = DEFAULT_STATE_PATH) -> bool:
+    """
+    Sync the command tree only when it changed since the last successful sync.
+    With guild_id, global commands are copied to that guild and synced there
+    instead, which applies instantly and is meant for development.
+    The fingerprint of each synced scope is kept in state_path.
+    Returns True if a sync was sent.
+    """
+    guild = discord.Object(id=guild_id) if guild_id else None
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+    # Keyed by application too, so switching bot tokens doesn't reuse another bot's state
+    scope = f"{tree.client.application_id}:" + (f"guild:{guild_id}" if guild is not None else "global")
+
+    fingerprint = tree_fingerprint(tree, guild)
+    state = _load_state(state_path)
+    if not force and state.get(scope) == fingerprint:
+        log.info("Command tree unchanged for %s, skipping sync", scope)
+        return False
+
+    await tree.sync(guild=guild)
+    state[scope] = fingerprint
+    try:
+        _save_state(state_path, state)
+    except OSError as e:
+        log.warning("Could not save command sync state to %s: %s", state_path, e)
+    return True
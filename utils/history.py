@@ -0,0 +1,78 @@
+import re
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
+import discord
+from utils.translation_cache import normalize_text
+
+# https://discord.com/channels/<guild or @me>/<channel>/<message>
+MESSAGE_LINK = re.compile(r"(?:https?://)?(?:\w+\.)?discord(?:app)?\.com/channels/(?:\d+|@me)/(\d+)/(\d+)")
+
+def parse_message_ref(value: str) -> Optional[tuple]:
+    """
+    (channel_id, message_id) from a message link, or (None, message_id) from a
+    bare message ID. None if value is neither.
+    """
+    value = value.strip()
+    match = MESSAGE_LINK.search(value)
+    if match:
+        return int(match[1]), int(match[2])
+    if value.isdigit():
+        return None, int(value)
+    return None
+
+async def history_range(channel, count: Optional[int] = None, since_id: Optional[int] = None,
+                        limit: int = 500) -> AsyncIterator[discord.Message]:
+    """
+    Messages of a channel or thread, oldest first: the last `count`, or everything
+    from message since_id on. Never more than limit. Pages are fetched as they're
+    consumed, so nothing but the current page is held in memory.
+    """
+    limit = min(count or limit, limit)
+    if since_id is None:
+        # Walk back to the first message of the range without keeping any of them
+        oldest = None
+        async for message in channel.history(limit=limit):
+            oldest = message
+        if oldest is None:
+            return
+        since_id = oldest.id
+    after = discord.Object(id=since_id - 1)
+    async for message in channel.history(limit=limit, after=after, oldest_first=True):
+        yield message
+
+class MessageFilter:
+    """
+    Drops messages from bots, messages without text and repeats of text seen among
+    the last `recent` kept messages. Counts what it drops.
+    """
+    def __init__(self, recent: int = 256):
+        self.recent = recent
+        self._seen = OrderedDict()
+        self.kept = 0
+        self.bots = 0
+        self.empty = 0
+        self.duplicates = 0
+
+    async def filter(self, messages: AsyncIterator[discord.Message]) -> AsyncIterator[discord.Message]:
+        async for message in messages:
+            if message.author.bot:
+                self.bots += 1
+                continue
+            text = normalize_text(message.content or "").casefold()
+            if not text:
+                self.empty += 1
+                continue
+            key = hash(text)
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                self.duplicates += 1
+                continue
+            self._seen[key] = None
+            if len(self._seen) > self.recent:
+                self._seen.popitem(last=False)
+            self.kept += 1
+            yield message
+
+    @property
+    def skipped(self) -> int:
+        return self.bots + self.empty + self.duplicates
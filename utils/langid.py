@@ -0,0 +1,144 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, List, NamedTuple, Optional
+
+# Parts of a Discord message that are never translated
+_UNTRANSLATABLE = re.compile(
+    r"```.*?```"                         # code blocks
+    r"|`[^`\n]*`"                        # inline code
+    r"|<a?:\w+:\d+>"                     # custom emoji
+    r"|<(?:@[!&]?|#)\d+>"                # user, role and channel mentions
+    r"|<t:-?\d+(?::\w)?>"                # timestamps
+    r"|\b(?:https?://|www\.)\S+"         # links
+    r"|\b[\w.+-]+@[\w-]+\.[\w.]+",       # email addresses
+    re.DOTALL
+)
+_NON_LETTERS = re.compile(r"[\W\d_]+")
+_LETTER = re.compile(r"[^\W\d_]")
+# Letters by script. Each of Cyrillic, Arabic, kana and Han is used by one supported
+# language, but also by unsupported ones (Ukrainian, Persian, Traditional Chinese...)
+_SCRIPTS = {
+    "latin": re.compile(r"[A-Za-z\u00C0-\u024F]"),
+    "ru": re.compile(r"[\u0400-\u052F]"),
+    "ar": re.compile(r"[\u0600-\u06FF\u0750-\u077F\uFB50-\uFDFF\uFE70-\uFEFF]"),
+    "kana": re.compile(r"[\u3040-\u30FF\u31F0-\u31FF\uFF66-\uFF9F]"),
+    "han": re.compile(r"[\u3400-\u4DBF\u4E00-\u9FFF\uF900-\uFAFF]"),
+}
+
+# Longer texts are identified from their start
+MAX_CHARS = 400
+# Below this many letters, Latin-script text is too short to tell languages apart
+MIN_LETTERS = 12
+# Smoothing for trigrams a profile has never seen
+_ALPHA = 0.5
+_VOCABULARY = 20000
+# Trigrams overlap, so each letter is counted about three times
+_OVERLAP = 3.0
+# Text in a supported language mostly uses trigrams its profile has seen; less
+# than MIN_COVERAGE suggests a language the bot has no profile for (Danish,
+# Tagalog...), and confidence drops to nothing at LOW_COVERAGE. Related languages
+# share about half their trigrams, so LOW_COVERAGE sits just above that.
+MIN_COVERAGE = 0.6
+LOW_COVERAGE = 0.5
+# Script alone can't rule out the other languages written in it, so it never
+# reaches the default TRANSLATION_LANGID_CONFIDENCE
+SCRIPT_CONFIDENCE = 0.5
+
+class Detection(NamedTuple):
+    """
+    language is a code from LANGUAGE_UI_OPTIONS, or None when unknown.
+    translatable is False when nothing is left once links, code, mentions,
+    emoji, numbers and punctuation are removed.
+    """
+    language: Optional[str]
+    confidence: float
+    translatable: bool = True
+
+NOTHING_TO_TRANSLATE = Detection(None, 1.0, False)
+UNKNOWN = Detection(None, 0.0)
+
+def _trigrams(letters: str) -> List[str]:
+    padded = f" {letters} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+@lru_cache(maxsize=1)
+def _profiles() -> Dict[str, Dict[str, float]]:
+    # Built from the shipped corpus on first use; log-probability of each trigram per language
+    from utils.langid_corpus import CORPUS, NEIGHBOURS
+    profiles = {}
+    for language, text in {**CORPUS, **NEIGHBOURS}.items():
+        counts = Counter(_trigrams(" ".join(_NON_LETTERS.sub(" ", text.lower()).split())))
+        total = sum(counts.values()) + _ALPHA * _VOCABULARY
+        profiles[language] = {
+            trigram: math.log((count + _ALPHA) / total) for trigram, count in counts.items()
+        }
+        profiles[language][None] = math.log(_ALPHA / total)
+    return profiles
+
+@lru_cache(maxsize=1)
+def _supported() -> frozenset:
+    from utils.langid_corpus import CORPUS
+    return frozenset(CORPUS)
+
+def _latin_language(letters: str) -> Detection:
+    trigrams = _trigrams(letters)
+    scores = {
+        language: sum(map(profile.get, trigrams, repeat(profile[None], len(trigrams))))
+        for language, profile in _profiles().items()
+    }
+    best = max(scores, key=scores.get)
+    # Posterior over the profiled languages, discounted for the overlap between trigrams
+    top = scores[best]
+    posterior = 1.0 / sum(math.exp((score - top) / _OVERLAP) for score in scores.values())
+    profile = _profiles()[best]
+    coverage = sum(map(profile.__contains__, trigrams)) / len(trigrams)
+    if best not in _supported():
+        return UNKNOWN
+    coverage = min(1.0, max(0.0, (coverage - LOW_COVERAGE) / (MIN_COVERAGE - LOW_COVERAGE)))
+    return Detection(best, posterior * coverage)
+
+def detect_language(text: str) -> Detection:
+    """
+    Identify the language of text locally. Latin-script text is scored against
+    trigram profiles of the supported Latin-script languages and their close
+    relatives; other scripts only suggest a language, with SCRIPT_CONFIDENCE.
+    Neighbours of the supported languages stay below the default threshold:
+
+    >>> max(detect_language(text).confidence for text in (
+    ...     "Привіт усім, сервер перезапуститься сьогодні ввечері о восьмій.",  # Ukrainian
+    ...     "Здравейте на всички, сървърът ще бъде рестартиран довечера.",  # Bulgarian
+    ...     "سلام به همه، سرور امشب ساعت هشت دوباره راه‌اندازی می‌شود؟",  # Persian
+    ...     "大家好，伺服器今晚八點會重新啟動。請記得儲存你們的進度。",  # Traditional Chinese
+    ...     "Wie heeft er zin om morgen samen te spelen? Ik ben vanaf drie uur online.",  # Dutch
+    ...     "Qui vol jugar demà amb nosaltres? Estaré connectat a partir de les tres.",  # Catalan
+    ...     "Quen quere xogar mañá connosco? Estarei conectado a partir das tres.",  # Galician
+    ... )) < 0.9
+    True
+    """
+    text = _UNTRANSLATABLE.sub(" ", text[:MAX_CHARS])
+    letters = "".join(_LETTER.findall(text))
+    if not letters:
+        return NOTHING_TO_TRANSLATE
+    scripts = Counter({script: len(pattern.findall(letters)) for script, pattern in _SCRIPTS.items()})
+    scripts[None] = len(letters) - sum(scripts.values())
+
+    # Japanese mixes kana with Han characters; Han alone is read as Chinese
+    if scripts["kana"]:
+        scripts["ja"] = scripts.pop("kana") + scripts.pop("han", 0)
+    elif scripts["han"]:
+        scripts["zh-cn"] = scripts.pop("han")
+    script, count = scripts.most_common(1)[0]
+    share = min(1.0, count / len(letters))
+
+    if script is None:
+        return UNKNOWN
+    if script != "latin":
+        return Detection(script, share * SCRIPT_CONFIDENCE)
+    if count < MIN_LETTERS:
+        return Detection(None, 0.0)
+    words = " ".join(_NON_LETTERS.sub(" ", text.lower()).split())
+    language, confidence = _latin_language(words)[:2]
+    return Detection(language, confidence * share)
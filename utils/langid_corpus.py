@@ -0,0 +1,148 @@
+# Training text for the trigram profiles in utils.langid, one sample per
+# Latin-script language the bot translates to. Languages with their own script
+# (Russian, Japanese, Chinese, Arabic) are only guessed from their script.
+# Everyday chat register on purpose: that's what people right-click on.
+
+CORPUS = {
+    "en": """
+Hey everyone, thanks for joining the server! Please read the rules before you post anything.
+The event starts on Saturday at six in the evening, and we will stream it in the voice channel.
+I think the new update broke something, because my game keeps crashing when I open the map.
+Does anyone know where I can find the patch notes? I looked in the announcements but they were not there.
+We are looking for two more players for the raid tonight, so let me know if you want to come.
+That was the funniest thing I have seen all week, I could not stop laughing.
+Remember to be nice to each other and have fun. If you have any questions, just ask one of the moderators.
+I will be away for a few days, but I should be back by the weekend with some good news.
+Can you send me the link again? The old one does not work anymore and I have no idea why.
+Thank you so much for your help, it really means a lot to me and the whole team.
+What do you think about the new channel layout? I would like to hear your feedback before we change anything else.
+The weather has been terrible here all week, it has not stopped raining since Monday.
+Good morning, how are you doing today? I hope you had a great night and that you slept well.
+""",
+    "es": """
+Hola a todos, gracias por unirse al servidor. Por favor, lean las reglas antes de publicar algo.
+El evento empieza el sábado a las seis de la tarde y lo vamos a transmitir en el canal de voz.
+Creo que la nueva actualización rompió algo, porque el juego se cierra cuando abro el mapa.
+¿Alguien sabe dónde puedo encontrar las notas del parche? Busqué en los anuncios pero no estaban.
+Estamos buscando dos jugadores más para la incursión de esta noche, avísenme si quieren venir.
+Eso fue lo más gracioso que he visto en toda la semana, no podía parar de reír.
+Recuerden ser amables entre ustedes y divertirse. Si tienen alguna pregunta, pregunten a un moderador.
+Voy a estar fuera unos días, pero debería volver el fin de semana con buenas noticias.
+¿Me puedes enviar el enlace otra vez? El anterior ya no funciona y no tengo idea de por qué.
+Muchas gracias por tu ayuda, de verdad significa mucho para mí y para todo el equipo.
+¿Qué les parece la nueva organización de los canales? Me gustaría saber su opinión antes de cambiar otra cosa.
+El tiempo ha estado horrible aquí toda la semana, no ha parado de llover desde el lunes.
+Buenos días, ¿cómo estás hoy? Espero que hayas tenido una buena noche y que hayas dormido bien.
+""",
+    "fr": """
+Salut tout le monde, merci d'avoir rejoint le serveur ! Lisez les règles avant de publier quoi que ce soit.
+L'événement commence samedi à six heures du soir et nous allons le diffuser dans le salon vocal.
+Je pense que la nouvelle mise à jour a cassé quelque chose, parce que mon jeu plante quand j'ouvre la carte.
+Est-ce que quelqu'un sait où je peux trouver les notes de mise à jour ? J'ai regardé dans les annonces mais elles n'y étaient pas.
+Nous cherchons encore deux joueurs pour le raid de ce soir, dites-moi si vous voulez venir.
+C'était la chose la plus drôle que j'ai vue de toute la semaine, je n'arrivais pas à arrêter de rire.
+N'oubliez pas d'être gentils les uns avec les autres et amusez-vous bien. Si vous avez des questions, demandez à un modérateur.
+Je serai absent pendant quelques jours, mais je devrais revenir ce week-end avec de bonnes nouvelles.
+Tu peux me renvoyer le lien ? L'ancien ne marche plus et je ne sais pas pourquoi.
+Merci beaucoup pour ton aide, ça compte vraiment pour moi et pour toute l'équipe.
+Que pensez-vous de la nouvelle organisation des salons ? J'aimerais avoir votre avis avant de changer autre chose.
+Il fait un temps horrible ici toute la semaine, il n'a pas arrêté de pleuvoir depuis lundi.
+Bonjour, comment ça va aujourd'hui ? J'espère que tu as passé une bonne nuit et que tu as bien dormi.
+""",
+    "de": """
+Hallo zusammen, danke, dass ihr dem Server beigetreten seid! Bitte lest die Regeln, bevor ihr etwas postet.
+Das Event beginnt am Samstag um sechs Uhr abends und wir streamen es im Sprachkanal.
+Ich glaube, das neue Update hat etwas kaputt gemacht, weil mein Spiel abstürzt, wenn ich die Karte öffne.
+Weiß jemand, wo ich die Patchnotes finden kann? Ich habe in den Ankündigungen nachgesehen, aber da waren sie nicht.
+Wir suchen noch zwei Spieler für den Raid heute Abend, sagt Bescheid, wenn ihr mitkommen wollt.
+Das war das Lustigste, was ich die ganze Woche gesehen habe, ich konnte nicht aufhören zu lachen.
+Denkt daran, nett zueinander zu sein und Spaß zu haben. Wenn ihr Fragen habt, fragt einfach einen der Moderatoren.
+Ich bin ein paar Tage weg, aber ich sollte bis zum Wochenende mit guten Neuigkeiten zurück sein.
+Kannst du mir den Link noch einmal schicken? Der alte funktioniert nicht mehr und ich habe keine Ahnung, warum.
+Vielen Dank für deine Hilfe, das bedeutet mir und dem ganzen Team wirklich viel.
+Was haltet ihr von der neuen Aufteilung der Kanäle? Ich würde gerne eure Meinung hören, bevor wir noch etwas ändern.
+Das Wetter war hier die ganze Woche schrecklich, es hat seit Montag nicht aufgehört zu regnen.
+Guten Morgen, wie geht es dir heute? Ich hoffe, du hattest eine schöne Nacht und hast gut geschlafen.
+""",
+    "it": """
+Ciao a tutti, grazie per essere entrati nel server! Per favore leggete le regole prima di pubblicare qualcosa.
+L'evento inizia sabato alle sei di sera e lo trasmetteremo nel canale vocale.
+Penso che il nuovo aggiornamento abbia rotto qualcosa, perché il gioco si chiude quando apro la mappa.
+Qualcuno sa dove posso trovare le note della patch? Ho guardato negli annunci ma non c'erano.
+Stiamo cercando altri due giocatori per il raid di stasera, fatemi sapere se volete venire.
+È stata la cosa più divertente che ho visto in tutta la settimana, non riuscivo a smettere di ridere.
+Ricordatevi di essere gentili gli uni con gli altri e di divertirvi. Se avete domande, chiedete a uno dei moderatori.
+Starò via per qualche giorno, ma dovrei tornare entro il fine settimana con delle belle notizie.
+Puoi mandarmi di nuovo il link? Quello vecchio non funziona più e non ho idea del perché.
+Grazie mille per il tuo aiuto, significa davvero tanto per me e per tutta la squadra.
+Cosa ne pensate della nuova organizzazione dei canali? Vorrei sentire la vostra opinione prima di cambiare altro.
+Il tempo è stato orribile qui tutta la settimana, non ha smesso di piovere da lunedì.
+Buongiorno, come stai oggi? Spero che tu abbia passato una bella notte e che abbia dormito bene.
+""",
+    "pt": """
+Olá a todos, obrigado por entrarem no servidor! Por favor, leiam as regras antes de publicar qualquer coisa.
+O evento começa no sábado às seis da tarde e vamos transmitir no canal de voz.
+Acho que a nova atualização quebrou alguma coisa, porque o meu jogo fecha quando eu abro o mapa.
+Alguém sabe onde posso encontrar as notas da atualização? Procurei nos anúncios mas não estavam lá.
+Estamos procurando mais dois jogadores para a raid de hoje à noite, me avisem se quiserem vir.
+Foi a coisa mais engraçada que eu vi a semana toda, não conseguia parar de rir.
+Lembrem-se de ser gentis uns com os outros e de se divertir. Se tiverem alguma pergunta, falem com um dos moderadores.
+Vou ficar fora por alguns dias, mas devo voltar até o fim de semana com boas notícias.
+Você pode me mandar o link de novo? O antigo não funciona mais e não faço ideia do porquê.
+Muito obrigado pela sua ajuda, isso significa muito para mim e para toda a equipe.
+O que vocês acham da nova organização dos canais? Gostaria de ouvir a opinião de vocês antes de mudar mais alguma coisa.
+O tempo esteve horrível aqui a semana toda, não parou de chover desde segunda-feira.
+Bom dia, como você está hoje? Espero que tenha tido uma boa noite e que tenha dormido bem.
+""",
+}
+
+# Close relatives of the supported languages. They're profiled only so that their
+# text is recognised as something else instead of passing for German, Spanish or
+# Portuguese; the bot doesn't translate to them.
+NEIGHBOURS = {
+    "nl": """
+Hoi allemaal, bedankt dat jullie lid zijn geworden van de server! Lees alsjeblieft de regels voordat je iets post.
+Het evenement begint zaterdag om zes uur 's avonds en we streamen het in het spraakkanaal.
+Ik denk dat de nieuwe update iets kapot heeft gemaakt, want mijn spel crasht steeds als ik de kaart open.
+Weet iemand waar ik de patchnotes kan vinden? Ik heb in de aankondigingen gekeken, maar daar stonden ze niet.
+We zoeken nog twee spelers voor de raid vanavond, laat het me weten als jullie mee willen doen.
+Dat was het grappigste wat ik de hele week heb gezien, ik kon niet stoppen met lachen.
+Vergeet niet aardig tegen elkaar te zijn en plezier te hebben. Als je vragen hebt, vraag het gewoon aan een van de moderators.
+Ik ben een paar dagen weg, maar ik zou tegen het weekend terug moeten zijn met goed nieuws.
+Kun je me de link nog een keer sturen? De oude werkt niet meer en ik heb geen idee waarom.
+Heel erg bedankt voor je hulp, het betekent echt veel voor mij en voor het hele team.
+Wat vinden jullie van de nieuwe indeling van de kanalen? Ik hoor graag jullie mening voordat we nog iets anders veranderen.
+Het weer is hier de hele week verschrikkelijk geweest, het heeft sinds maandag niet meer opgehouden met regenen.
+Goedemorgen, hoe gaat het vandaag met je? Ik hoop dat je een fijne avond hebt gehad en dat je goed hebt geslapen.
+""",
+    "ca": """
+Hola a tothom, gràcies per unir-vos al servidor! Si us plau, llegiu les normes abans de publicar res.
+L'esdeveniment comença dissabte a les sis de la tarda i el retransmetrem al canal de veu.
+Crec que la nova actualització ha trencat alguna cosa, perquè el joc es tanca quan obro el mapa.
+Algú sap on puc trobar les notes del pedaç? He mirat als anuncis però no hi eren.
+Busquem dos jugadors més per a la incursió d'aquesta nit, aviseu-me si voleu venir.
+Això ha estat el més divertit que he vist en tota la setmana, no podia parar de riure.
+Recordeu ser amables els uns amb els altres i divertir-vos. Si teniu cap pregunta, pregunteu a un dels moderadors.
+Estaré fora uns quants dies, però hauria de tornar el cap de setmana amb bones notícies.
+Em pots tornar a enviar l'enllaç? L'antic ja no funciona i no tinc ni idea de per què.
+Moltes gràcies per la teva ajuda, de veritat que significa molt per a mi i per a tot l'equip.
+Què us sembla la nova organització dels canals? M'agradaria saber la vostra opinió abans de canviar res més.
+Aquí ha fet un temps horrible tota la setmana, no ha parat de ploure des de dilluns.
+Bon dia, com estàs avui? Espero que hagis passat una bona nit i que hagis dormit bé.
+""",
+    "gl": """
+Ola a todos, grazas por unirvos ao servidor! Por favor, lede as normas antes de publicar nada.
+O evento comeza o sábado ás seis da tarde e imos emitilo na canle de voz.
+Creo que a nova actualización rompeu algo, porque o xogo péchase cando abro o mapa.
+Alguén sabe onde podo atopar as notas do parche? Mirei nos anuncios pero non estaban.
+Estamos a buscar dous xogadores máis para a incursión desta noite, avisádeme se queredes vir.
+Iso foi o máis gracioso que vin en toda a semana, non podía parar de rir.
+Lembrade ser amables uns cos outros e divertirvos. Se tedes algunha pregunta, preguntádelle a un dos moderadores.
+Vou estar fóra uns días, pero debería volver o fin de semana con boas novas.
+Podes mandarme a ligazón outra vez? A vella xa non funciona e non teño nin idea de por que.
+Moitas grazas pola túa axuda, de verdade significa moito para min e para todo o equipo.
+Que vos parece a nova organización das canles? Gustaríame coñecer a vosa opinión antes de cambiar outra cousa.
+O tempo estivo horrible aquí toda a semana, non parou de chover dende o luns.
+Bos días, como estás hoxe? Espero que tiveses unha boa noite e que durmises ben.
+""",
+}
@@ -0,0 +1,190 @@
+import asyncio
+import functools
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter as _Tally
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+log = logging.getLogger(__name__)
+
+# Seconds; covers cached renders up to slow upstream translations
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(names: Sequence[str], values: Tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = _Tally()
+
+    def inc(self, *labels, amount: float = 1.0):
+        self._values[labels] += amount
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames + ("le",), labels + (bound,))
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            inf_labels = _format_labels(self.labelnames + ("le",), labels + ("+Inf",))
+            yield f"{self.name}_bucket{inf_labels} {series[-1]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-2]}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}"
+
+class Gauge:
+    """
+    A gauge read when scraped. `read` returns a number, or a dict of label value -> number.
+    """
+    def __init__(self, name: str, help_text: str, read: Callable, labelname: Optional[str] = None):
+        self.name = name
+        self.help = help_text
+        self.read = read
+        self.labelname = labelname
+
+    def collect(self):
+        try:
+            value = self.read()
+        except Exception as e:
+            log.debug("Gauge %s failed: %s", self.name, e)
+            return
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        if isinstance(value, dict):
+            for label, number in value.items():
+                if isinstance(number, (int, float)):
+                    yield f"{self.name}{_format_labels((self.labelname,), (label,))} {float(number)}"
+        elif value is not None:
+            yield f"{self.name} {float(value)}"
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+HANDLER_CALLS = REGISTRY.register(Counter(
+    "chroma_handler_calls_total", "Command and component callbacks handled.", ("handler",)))
+HANDLER_ERRORS = REGISTRY.register(Counter(
+    "chroma_handler_errors_total", "Callbacks that raised, by exception type.", ("handler", "error")))
+HANDLER_LATENCY = REGISTRY.register(Histogram(
+    "chroma_handler_latency_seconds", "Time spent in command and component callbacks.", ("handler",)))
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    "chroma_upstream_translation_seconds", "Upstream translation call time.", ("backend", "outcome")))
+LOOP_LAG = REGISTRY.register(Histogram(
+    "chroma_event_loop_lag_seconds", "How late the event loop ran a scheduled wake-up.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)))
+
+def register_stats_gauges(prefix: str, read: Callable[[], dict]):
+    """
+    Expose every number in a stats() dict as chroma_<prefix>{stat="..."}.
+    """
+    REGISTRY.register(Gauge(f"chroma_{prefix}", f"Counters and gauges from {prefix} stats.", read, labelname="stat"))
+
+def instrument(handler: str):
+    """
+    Decorate a command or component callback to record calls, latency and errors.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                HANDLER_ERRORS.inc(handler, type(e).__name__)
+                raise
+            finally:
+                HANDLER_CALLS.inc(handler)
+                HANDLER_LATENCY.observe(time.perf_counter() - start, handler)
+        return wrapper
+    return decorator
+
+async def monitor_event_loop(interval: float = 0.5):
+    """
+    Measure event-loop lag: how much later than requested each sleep wakes up.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(max(0.0, loop.time() - start - interval))
+
+class MetricsServer:
+    """
+    Serves REGISTRY in Prometheus text format at /metrics and runs the loop-lag monitor.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 9100):
+        self.host = host
+        self.port = port
+        self._runner = None
+        self._monitor = None
+
+    async def start(self):
+        from aiohttp import web
+
+        async def metrics(request):
+            return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8",
+                                headers={"X-Content-Type-Options": "nosniff"})
+
+        app = web.Application()
+        app.router.add_get("/metrics", metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self._monitor = asyncio.ensure_future(monitor_event_loop())
+
+    async def stop(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
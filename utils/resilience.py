@@ -0,0 +1,174 @@
+import asyncio
+import time
+from collections import deque
+from typing import List, Optional
+from utils.metrics import UPSTREAM_LATENCY
+
+class TranslationError(Exception):
+    """Base class for translation failures surfaced to users."""
+
+class TranslationTimeout(TranslationError):
+    def __init__(self, message: str = "The translation service took too long to respond, please try again."):
+        super().__init__(message)
+
+class CircuitOpenError(TranslationError):
+    def __init__(self, message: str = "The translation service is temporarily unavailable, please try again shortly."):
+        super().__init__(message)
+
+class CircuitBreaker:
+    """
+    Fails fast while the upstream is unhealthy.
+    After failure_threshold consecutive failures the circuit opens and calls are
+    rejected for reset_timeout seconds. Then a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_running = False
+
+    def before_call(self):
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError()
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._trial_running:
+                self.rejected += 1
+                raise CircuitOpenError()
+            self._trial_running = True
+
+    def record_success(self):
+        self._trial_running = False
+        self.failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self._trial_running = False
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def record_abandoned(self):
+        # A cancelled call tells us nothing about upstream health
+        self._trial_running = False
+
+class LatencyTracker:
+    """
+    Rolling window of recent call latencies (seconds).
+    """
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))
+        return ordered[index]
+
+class ResilientBackend:
+    """
+    Wraps a translation backend with a circuit breaker and optional hedged requests.
+    With hedging on, a second attempt is fired if the first hasn't finished after the
+    recent p95 latency (never sooner than hedge_min_delay); whichever succeeds first
+    wins and the other attempt is cancelled.
+    """
+    def __init__(self, backend, breaker: Optional[CircuitBreaker] = None, hedge: bool = False,
+                 hedge_percentile: float = 95.0, hedge_min_delay: float = 0.05,
+                 hedge_min_samples: int = 20):
+        self.backend = backend
+        self.name = backend.name
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyTracker()
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(self.hedge_percentile))
+
+    async def _call(self, coro_factory):
+        self.breaker.before_call()
+        start = time.monotonic()
+        try:
+            result = await coro_factory()
+        except asyncio.CancelledError:
+            self.breaker.record_abandoned()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            UPSTREAM_LATENCY.observe(time.monotonic() - start, self.name, "error")
+            raise
+        elapsed = time.monotonic() - start
+        self.breaker.record_success()
+        self.latency.add(elapsed)
+        UPSTREAM_LATENCY.observe(elapsed, self.name, "ok")
+        return result
+
+    async def _hedged(self, text: str, dest_language: str) -> dict:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self.backend.translate(text, dest_language)
+
+        attempts = [asyncio.ensure_future(self.backend.translate(text, dest_language))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                self.hedges += 1
+                attempts.append(asyncio.ensure_future(self.backend.translate(text, dest_language)))
+            pending = set(attempts)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if attempt is not attempts[0]:
+                            self.hedge_wins += 1
+                        return attempt.result()
+                    error = attempt.exception()
+            raise error
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+    async def translate(self, text: str, dest_language: str) -> dict:
+        return await self._call(lambda: self._hedged(text, dest_language))
+
+    async def translate_batch(self, texts: List[str], dest_language: str) -> List[dict]:
+        return await self._call(lambda: self.backend.translate_batch(texts, dest_language))
+
+    async def aclose(self):
+        await self.backend.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "circuit_state": self.breaker.state,
+            "circuit_rejected": self.breaker.rejected,
+            "p95_latency": self.latency.percentile(95.0),
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins
+        }
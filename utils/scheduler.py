@@ -0,0 +1,167 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Hashable, Optional
+from utils.resilience import TranslationError
+
+class SchedulerBusy(TranslationError):
+    def __init__(self, message: str = "Chroma is handling a lot of translations right now, please try again in a moment."):
+        super().__init__(message)
+
+class TokenBucket:
+    """
+    Refills at `rate` tokens per second up to `burst` tokens.
+    """
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def delay(self) -> float:
+        """Seconds until a token is available."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class UpstreamScheduler:
+    """
+    Admission control in front of the upstream translation service.
+
+    Requests run straight away while the global token bucket has tokens. Otherwise
+    they wait in a bounded queue served by weighted round-robin: guilds take turns
+    (a guild with weight 2 gets two grants per turn), and within a guild its users
+    take turns, so one busy user or server can't starve the rest. When the queue,
+    or a single user's share of it, is full, callers are rejected with SchedulerBusy.
+    """
+    def __init__(self, rate: float = 10.0, burst: int = 20, max_queue: int = 200,
+                 max_per_user: int = 5, guild_weights: Optional[Dict[Hashable, int]] = None):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.guild_weights = dict(guild_weights or {})
+        self._guilds = OrderedDict()  # guild -> OrderedDict(user -> deque of (future, queued_at))
+        self._credits = {}
+        self._depth = 0
+        self._dispatcher = None
+
+        self.admitted = 0
+        self.rejected = 0
+        self.last_wait = 0.0
+        self.avg_wait = 0.0
+        self.max_wait = 0.0
+
+    def set_guild_weight(self, guild_id: Hashable, weight: int):
+        self.guild_weights[guild_id] = max(1, int(weight))
+
+    def _record_wait(self, seconds: float):
+        self.admitted += 1
+        self.last_wait = seconds
+        self.avg_wait = seconds if self.admitted == 1 else 0.9 * self.avg_wait + 0.1 * seconds
+        self.max_wait = max(self.max_wait, seconds)
+
+    async def acquire(self, guild_id: Optional[Hashable] = None, user_id: Optional[Hashable] = None):
+        if self._depth == 0 and self.bucket.try_take():
+            self._record_wait(0.0)
+            return
+
+        if self._depth >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerBusy()
+        users = self._guilds.get(guild_id)
+        waiters = users.get(user_id) if users is not None else None
+        if waiters is not None and len(waiters) >= self.max_per_user:
+            self.rejected += 1
+            raise SchedulerBusy()
+
+        if users is None:
+            users = self._guilds[guild_id] = OrderedDict()
+        if waiters is None:
+            waiters = users[user_id] = deque()
+        entry = (asyncio.get_running_loop().create_future(), time.monotonic())
+        waiters.append(entry)
+        self._depth += 1
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+        try:
+            await entry[0]
+        except asyncio.CancelledError:
+            self._forget(guild_id, user_id, entry)
+            raise
+
+    def _forget(self, guild_id: Hashable, user_id: Hashable, entry: tuple):
+        users = self._guilds.get(guild_id)
+        waiters = users.get(user_id) if users is not None else None
+        if waiters is None or entry not in waiters:
+            return
+        waiters.remove(entry)
+        self._depth -= 1
+        if not waiters:
+            del users[user_id]
+            if not users:
+                del self._guilds[guild_id]
+                self._credits.pop(guild_id, None)
+
+    def _next_waiter(self) -> tuple:
+        guild_id, users = next(iter(self._guilds.items()))
+        credit = self._credits.get(guild_id) or self.guild_weights.get(guild_id, 1)
+        user_id, waiters = next(iter(users.items()))
+        entry = waiters.popleft()
+        self._depth -= 1
+
+        if waiters:
+            users.move_to_end(user_id)
+        else:
+            del users[user_id]
+        credit -= 1
+        if not users:
+            del self._guilds[guild_id]
+            self._credits.pop(guild_id, None)
+        elif credit <= 0:
+            self._guilds.move_to_end(guild_id)
+            self._credits.pop(guild_id, None)
+        else:
+            self._credits[guild_id] = credit
+        return entry
+
+    async def _dispatch(self):
+        try:
+            while self._depth:
+                delay = self.bucket.delay()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                future, queued_at = self._next_waiter()
+                if future.done():
+                    continue
+                self.bucket.try_take()
+                self._record_wait(time.monotonic() - queued_at)
+                future.set_result(None)
+        finally:
+            self._dispatcher = None
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._depth,
+            "queued_guilds": len(self._guilds),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "last_wait": self.last_wait,
+            "avg_wait": self.avg_wait,
+            "max_wait": self.max_wait,
+            "tokens": self.bucket.tokens
+        }
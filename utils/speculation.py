@@ -0,0 +1,117 @@
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable, Hashable, NamedTuple, Optional
+
+class _Speculation(NamedTuple):
+    guess: Hashable
+    task: asyncio.Task
+    expires_at: float
+
+class SpeculativeTasks:
+    """
+    Work started before the user asks for it, on a guess of what they will choose.
+    Each (owner, key) has at most one task. claim() hands the task over when the
+    user's choice matches the guess and cancels it otherwise. Every owner can have
+    max_per_owner tasks and the registry max_total; going over cancels the oldest.
+    Tasks that aren't claimed within ttl seconds are cancelled.
+    """
+    def __init__(self, max_per_owner: int = 2, ttl: float = 60.0, max_total: int = 1000):
+        self.max_per_owner = max_per_owner
+        self.ttl = ttl
+        self.max_total = max_total
+        self._entries = OrderedDict()  # (owner, key) -> _Speculation, oldest first
+        self._per_owner = defaultdict(int)
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def _remove(self, entry_key: tuple, cancel: bool = True) -> Optional[_Speculation]:
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return None
+        owner = entry_key[0]
+        self._per_owner[owner] -= 1
+        if self._per_owner[owner] <= 0:
+            del self._per_owner[owner]
+        if cancel and not entry.task.done():
+            entry.task.cancel()
+        return entry
+
+    def _expire(self, now: float):
+        while self._entries:
+            entry_key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                return
+            self._remove(entry_key)
+            self.expired += 1
+
+    def start(self, owner: Hashable, key: Hashable, guess: Hashable,
+              factory: Callable[[], Awaitable]) -> bool:
+        """
+        Start factory() in the background for (owner, key), replacing any earlier
+        guess. Returns False if max_per_owner is 0.
+        """
+        if self.max_per_owner <= 0:
+            return False
+        now = time.monotonic()
+        self._expire(now)
+        entry_key = (owner, key)
+        if self._remove(entry_key) is not None:
+            self.misses += 1
+
+        while self._per_owner.get(owner, 0) >= self.max_per_owner:
+            oldest = next(k for k in self._entries if k[0] == owner)
+            self._remove(oldest)
+            self.evicted += 1
+        while len(self._entries) >= self.max_total:
+            self._remove(next(iter(self._entries)))
+            self.evicted += 1
+
+        task = asyncio.ensure_future(factory())
+        # Nobody may ever await a task that is evicted or expires; don't warn about it
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._entries[entry_key] = _Speculation(guess, task, now + self.ttl)
+        self._per_owner[owner] += 1
+        self.started += 1
+        return True
+
+    def claim(self, owner: Hashable, key: Hashable, choice: Hashable) -> Optional[asyncio.Task]:
+        """
+        The task guessed for (owner, key) if it guessed `choice`, or None.
+        A task with a different guess is cancelled.
+        """
+        self._expire(time.monotonic())
+        entry = self._entries.get((owner, key))
+        if entry is None:
+            return None
+        if entry.guess != choice:
+            self._remove((owner, key))
+            self.misses += 1
+            return None
+        self._remove((owner, key), cancel=False)
+        self.hits += 1
+        return entry.task
+
+    def cancel(self, owner: Hashable, key: Hashable):
+        if self._remove((owner, key)) is not None:
+            self.misses += 1
+
+    def clear(self):
+        """
+        Cancel every pending task.
+        """
+        for entry_key in list(self._entries):
+            self._remove(entry_key)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._entries),
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "expired": self.expired
+        }
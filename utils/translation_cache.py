@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for cache lookups: NFC unicode form, trimmed,
+    with runs of whitespace collapsed to a single space.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def cache_key(text: str, dest_language: str) -> str:
+    normalized = normalize_text(text)
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"{dest_language.lower()}:{digest}"
+
+def _entry_size(value: dict) -> int:
+    return sum(len(str(v).encode("utf-8")) for v in value.values())
+
+class SQLiteTier:
+    """
+    Optional on-disk tier so cached translations survive restarts.
+    All queries run on a single worker thread so the event loop never blocks.
+    """
+    def __init__(self, path: str, max_entries: int = 50000):
+        self.path = path
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="translation-cache")
+        self._lock = threading.Lock()
+        self._writes = 0
+        import sqlite3
+        # DB-API style, so callers can catch errors without importing sqlite3
+        self.Error = sqlite3.Error
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed_at)")
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE translations SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return json.loads(row[0]), row[1]
+
+    def _set(self, key: str, value: dict, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, time.time())
+            )
+            self._writes += 1
+            # Prune every so often rather than on every write
+            if self._writes % 100 == 0:
+                self._conn.execute("DELETE FROM translations WHERE expires_at <= ?", (time.time(),))
+                self._conn.execute(
+                    "DELETE FROM translations WHERE key IN ("
+                    "SELECT key FROM translations ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[tuple]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._get, key)
+
+    async def set(self, key: str, value: dict, expires_at: float):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._set, key, value, expires_at)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+class TranslationCache:
+    """
+    Two-tier translation cache keyed on (normalized text hash, target language).
+    The in-memory tier is an LRU bounded by entry count and total size, with a TTL
+    on every entry. If a disk path is given, misses fall through to SQLite and
+    memory evictions can still be served from disk after a restart.
+    """
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 8 * 1024 * 1024,
+                 ttl: float = 86400.0, disk_path: Optional[str] = None,
+                 disk_max_entries: int = 50000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self.disk = None
+        if disk_path:
+            # Imported here so sqlite3 is only loaded when a disk tier is configured
+            import sqlite3
+            try:
+                self.disk = SQLiteTier(disk_path, disk_max_entries)
+            except sqlite3.Error as e:
+                log.warning("Translation cache disk tier disabled: %s", e)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _store(self, key: str, value: dict, expires_at: float):
+        size = _entry_size(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    async def get(self, text: str, dest_language: str) -> Optional[dict]:
+        key = cache_key(text, dest_language)
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at, size = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(value)
+            del self._entries[key]
+            self._bytes -= size
+            self.expirations += 1
+
+        if self.disk is not None:
+            try:
+                found = await self.disk.get(key)
+            except self.disk.Error as e:
+                log.warning("Translation cache disk read failed: %s", e)
+                found = None
+            if found is not None:
+                value, wall_expires_at = found
+                remaining = wall_expires_at - time.time()
+                self._store(key, value, time.monotonic() + remaining)
+                self.disk_hits += 1
+                return dict(value)
+
+        self.misses += 1
+        return None
+
+    async def set(self, text: str, dest_language: str, value: dict):
+        key = cache_key(text, dest_language)
+        self._store(key, dict(value), time.monotonic() + self.ttl)
+        if self.disk is not None:
+            try:
+                await self.disk.set(key, value, time.time() + self.ttl)
+            except self.disk.Error as e:
+                log.warning("Translation cache disk write failed: %s", e)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
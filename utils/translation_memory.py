@@ -0,0 +1,396 @@
+import asyncio
+import hashlib
+import logging
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
+from utils.translation_cache import normalize_text
+
+log = logging.getLogger(__name__)
+
+# Words (numbers may carry separators: 1,000.50 or 18:00), mentions and custom
+# emoji, links, and single punctuation marks
+_TOKEN = re.compile(r"<[^<>\s]+>|https?://\S+|\w+(?:[.,:]\d+)*|[^\w\s]")
+_DIGIT = re.compile(r"\d")
+
+# MinHash signature: one-permutation hashing into SIGNATURE_SIZE buckets,
+# banded for the LSH index (BANDS bands of SIGNATURE_SIZE // BANDS rows)
+SIGNATURE_SIZE = 32
+BANDS = 8
+_ROWS = SIGNATURE_SIZE // BANDS
+_EMPTY = (1 << 64) - 1
+# Candidates verified per lookup, most similar first
+MAX_CANDIDATES = 5
+# Signatures only look at the start of long texts; patch() still compares all of it
+SIGNATURE_TOKENS = 128
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN.findall(text):
+        # "!!!" and "!" are the same for reuse purposes
+        if tokens and not token[0].isalnum() and len(token) == 1 and tokens[-1] == token:
+            continue
+        tokens.append(token)
+    return tokens
+
+def _slot(token: str) -> Optional[str]:
+    """
+    The kind of placeholder token is, or None for an ordinary word.
+    Placeholders are the parts a translation carries over verbatim: numbers,
+    links, mentions and emoji. Words never are, not even names ("Paris" may be
+    "París"), so they're left to the upstream translation.
+    """
+    if token.startswith("<") or token.startswith("http"):
+        return "ref"
+    if _DIGIT.search(token):
+        return "number"
+    return None
+
+def _shingles(tokens: List[str]) -> set:
+    # Placeholders are masked, so templated messages shingle identically
+    masked = []
+    for token in tokens[:SIGNATURE_TOKENS]:
+        slot = _slot(token)
+        masked.append(f"\x00{slot}" if slot else token.casefold())
+    return set(masked) | {f"{a} {b}" for a, b in zip(masked, masked[1:])}
+
+def signature(tokens: List[str]) -> Tuple[int, ...]:
+    """
+    One-permutation MinHash of the text's word and word-pair shingles: each
+    shingle hash goes to one bucket, which keeps its minimum. Empty buckets borrow
+    from the next non-empty one so short texts compare fairly.
+    """
+    buckets = [_EMPTY] * SIGNATURE_SIZE
+    for shingle in _shingles(tokens):
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        bucket = value % SIGNATURE_SIZE
+        if value < buckets[bucket]:
+            buckets[bucket] = value
+    if all(value == _EMPTY for value in buckets):
+        return tuple(buckets)
+    for i in range(SIGNATURE_SIZE):
+        offset = 1
+        while buckets[i] == _EMPTY:
+            borrowed = buckets[(i + offset) % SIGNATURE_SIZE]
+            if borrowed != _EMPTY:
+                buckets[i] = borrowed ^ offset
+            offset += 1
+    return tuple(buckets)
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """
+    Estimated Jaccard similarity of the shingle sets behind two signatures.
+    """
+    return sum(x == y for x, y in zip(a, b)) / SIGNATURE_SIZE
+
+def patch(source: List[str], translation: str, text: List[str]) -> Optional[str]:
+    """
+    Adapt a stored translation of `source` to the new `text`. The token lists must
+    line up, and may only differ in case, or in placeholders that occur once in
+    the source and once, verbatim, in the translation. Returns None otherwise.
+    All placeholders are found in the stored translation before any is replaced,
+    so swapped values stay swapped:
+
+    >>> patch(tokenize("<@11> beat <@22> 3 to 1 tonight"), "<@11> venció a <@22> 3 a 1 esta noche",
+    ...       tokenize("<@22> beat <@11> 1 to 3 tonight"))
+    '<@22> venció a <@11> 1 a 3 esta noche'
+    >>> patch(tokenize("Alice reached level 5 and won 50 coins."), "Alice alcanzó el nivel 5 y ganó 50 monedas.",
+    ...       tokenize("Alice reached level 50 and won 5 coins."))
+    'Alice alcanzó el nivel 50 y ganó 5 monedas.'
+    >>> patch(tokenize("Meet me in Paris tomorrow at 5"), "Retrouve-moi à Paris demain à 5h",
+    ...       tokenize("Meet me in Germany tomorrow at 5")) is None
+    True
+    """
+    if len(source) != len(text):
+        return None
+    spans = []
+    replaced = set()
+    for old, new in zip(source, text):
+        if old.casefold() == new.casefold():
+            continue
+        if not _slot(old) or not _slot(new) or old in replaced:
+            return None
+        if source.count(old) != 1:
+            return None
+        matches = list(re.finditer(rf"(?<!\w){re.escape(old)}(?!\w)", translation))
+        if len(matches) != 1:
+            return None
+        replaced.add(old)
+        spans.append((matches[0].start(), matches[0].end(), new))
+    # One pass over the original translation; overlapping placeholders ("3" in "3.5") can't be patched
+    spans.sort()
+    parts = []
+    end = 0
+    for start, stop, new in spans:
+        if start < end:
+            return None
+        parts.append(translation[end:start])
+        parts.append(new)
+        end = stop
+    parts.append(translation[end:])
+    return "".join(parts)
+
+class _Entry(NamedTuple):
+    dest_language: str
+    source: str
+    translated_text: str
+    src_language: str
+    signature: Tuple[int, ...]
+
+def _exact_key(text: str, dest_language: str) -> tuple:
+    return dest_language, normalize_text(text).casefold()
+
+def _bands(dest_language: str, sig: Tuple[int, ...]) -> List[tuple]:
+    return [(dest_language, band, sig[band * _ROWS:(band + 1) * _ROWS]) for band in range(BANDS)]
+
+class _MemoryStore:
+    """
+    SQLite persistence for TranslationMemory, on a single worker thread. The
+    database is opened there too, on first use.
+    """
+    def __init__(self, path: str):
+        import sqlite3
+        self.Error = sqlite3.Error
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="translation-memory")
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            import sqlite3
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memory ("
+                "id INTEGER PRIMARY KEY, dest_language TEXT NOT NULL, source TEXT NOT NULL, "
+                "translated_text TEXT NOT NULL, src_language TEXT NOT NULL, signature BLOB NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _load(self, limit: int) -> List[Tuple[int, _Entry]]:
+        # Most recently used last, so they're evicted last
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT * FROM (SELECT id, dest_language, source, translated_text, src_language, signature, "
+                "accessed_at FROM memory ORDER BY accessed_at DESC LIMIT ?) ORDER BY accessed_at", (limit,)
+            ).fetchall()
+            self._conn.execute(
+                "DELETE FROM memory WHERE id NOT IN (SELECT id FROM memory ORDER BY accessed_at DESC LIMIT ?)",
+                (limit,)
+            )
+            self._conn.commit()
+        return [
+            (row[0], _Entry(row[1], row[2], row[3], row[4], struct.unpack(f"<{SIGNATURE_SIZE}Q", row[5])))
+            for row in rows
+        ]
+
+    async def load(self, limit: int) -> List[Tuple[int, _Entry]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._load, limit)
+
+    def _write(self, sql: str, params: tuple):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(sql, params)
+            conn.commit()
+
+    async def _run(self, sql: str, params: tuple):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._write, sql, params)
+
+    async def put(self, entry_id: int, entry: _Entry):
+        await self._run(
+            "INSERT OR REPLACE INTO memory VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (entry_id, entry.dest_language, entry.source, entry.translated_text, entry.src_language,
+             struct.pack(f"<{SIGNATURE_SIZE}Q", *entry.signature), time.time())
+        )
+
+    async def touch(self, entry_id: int):
+        await self._run("UPDATE memory SET accessed_at = ? WHERE id = ?", (time.time(), entry_id))
+
+    async def delete(self, entry_id: int):
+        await self._run("DELETE FROM memory WHERE id = ?", (entry_id,))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class TranslationMemory:
+    """
+    Past translations, found again for near-duplicate texts: the same message with
+    other numbers, links or mentions, different case or repeated punctuation.
+    Candidates come from a MinHash LSH index and need an estimated similarity of at
+    least `threshold`; a candidate is only used if patch() can adapt it exactly.
+    Holds at most max_entries, evicting the least recently used, and is kept in
+    SQLite at `path` if one is given, loaded in the background on first use.
+    """
+    def __init__(self, max_entries: int = 5000, threshold: float = 0.8, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries = OrderedDict()  # id -> _Entry, least recently used first
+        self._index = defaultdict(set)  # band -> ids
+        self._exact = {}  # (dest language, normalized and case-folded source) -> id
+        self._next_id = 1
+        self.store = _MemoryStore(path) if path else None
+        self._loading = None
+
+        self.reused = 0
+        self.patched = 0
+        self.misses = 0
+        self.stored = 0
+        self.evictions = 0
+
+    async def load(self):
+        """
+        Load the entries kept in SQLite, once; lookup() and add() wait for it.
+        """
+        if self.store is None:
+            return
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+        await asyncio.shield(self._loading)
+
+    async def _load(self):
+        try:
+            rows = await self.store.load(self.max_entries)
+        except self.store.Error as e:
+            log.warning("Translation memory persistence disabled: %s", e)
+            store, self.store = self.store, None
+            store.close()
+            return
+        for entry_id, entry in rows:
+            self._insert(entry_id, entry)
+
+    def _insert(self, entry_id: int, entry: _Entry):
+        self._entries[entry_id] = entry
+        for band in _bands(entry.dest_language, entry.signature):
+            self._index[band].add(entry_id)
+        self._exact[_exact_key(entry.source, entry.dest_language)] = entry_id
+        self._next_id = max(self._next_id, entry_id + 1)
+
+    def _remove(self, entry_id: int) -> Optional[_Entry]:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return None
+        for band in _bands(entry.dest_language, entry.signature):
+            ids = self._index.get(band)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._index[band]
+        self._exact.pop(_exact_key(entry.source, entry.dest_language), None)
+        return entry
+
+    def _match(self, text: str, dest_language: str) -> Optional[Tuple[int, str]]:
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        exact = self._exact.get(_exact_key(text, dest_language))
+        if exact is not None:
+            return exact, self._entries[exact].translated_text
+        sig = signature(tokens)
+        candidates = set()
+        for band in _bands(dest_language, sig):
+            candidates |= self._index.get(band, set())
+        scored = sorted(
+            ((similarity(sig, self._entries[entry_id].signature), entry_id) for entry_id in candidates),
+            reverse=True
+        )
+        for score, entry_id in scored[:MAX_CANDIDATES]:
+            if score < self.threshold:
+                break
+            entry = self._entries[entry_id]
+            patched = patch(tokenize(entry.source), entry.translated_text, tokens)
+            if patched is not None:
+                return entry_id, patched
+        return None
+
+    async def lookup(self, text: str, dest_language: str) -> Optional[dict]:
+        """
+        A translation of text adapted from a near-duplicate seen before, or None.
+        The result's "memory" key says whether it was "reused" as is or "patched".
+        """
+        await self.load()
+        dest_language = dest_language.lower()
+        found = self._match(text, dest_language)
+        if found is None:
+            self.misses += 1
+            return None
+        entry_id, translated_text = found
+        entry = self._entries[entry_id]
+        self._entries.move_to_end(entry_id)
+        kind = "reused" if translated_text == entry.translated_text else "patched"
+        if kind == "reused":
+            self.reused += 1
+        else:
+            self.patched += 1
+        if self.store is not None:
+            try:
+                await self.store.touch(entry_id)
+            except self.store.Error as e:
+                log.warning("Translation memory write failed: %s", e)
+        return {
+            "translated_text": translated_text,
+            "src_language": entry.src_language,
+            "dest_language": dest_language,
+            "memory": kind
+        }
+
+    async def add(self, text: str, dest_language: str, translation: dict):
+        """
+        Remember an upstream translation of text.
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        await self.load()
+        dest_language = dest_language.lower()
+        entry = _Entry(dest_language, text, translation["translated_text"],
+                       translation.get("src_language") or "", signature(tokens))
+        replaced = self._exact.get(_exact_key(text, dest_language))
+        if replaced is not None:
+            self._remove(replaced)
+        entry_id = self._next_id
+        self._insert(entry_id, entry)
+        self.stored += 1
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            evicted.append(oldest)
+            self.evictions += 1
+
+        if self.store is not None:
+            try:
+                for old_id in ([replaced] if replaced is not None else []) + evicted:
+                    await self.store.delete(old_id)
+                await self.store.put(entry_id, entry)
+            except self.store.Error as e:
+                log.warning("Translation memory write failed: %s", e)
+
+    def stats(self) -> dict:
+        lookups = self.reused + self.patched + self.misses
+        return {
+            "reused": self.reused,
+            "patched": self.patched,
+            "misses": self.misses,
+            "stored": self.stored,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "hit_ratio": (self.reused + self.patched) / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
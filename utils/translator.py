@@ -1,24 +1,448 @@
-from googletrans import Translator
+import asyncio
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, Callable, List, Optional, Sequence, Tuple, TypeVar
+from utils.backends import BATCH_SEPARATOR, TranslationBackend, create_backend, preload_backend
+from utils.batcher import TranslationBatcher
+from utils.langid import detect_language
+from utils.resilience import CircuitBreaker, ResilientBackend, TranslationTimeout
+from utils.scheduler import UpstreamScheduler
+from utils.settings import env_bool, env_int, env_float, env_str
+from utils.singleflight import SingleFlight
+from utils.speculation import SpeculativeTasks
+from utils.translation_cache import TranslationCache, cache_key
+from utils.translation_memory import TranslationMemory
 
-async def translate_text(text: str, dest_language: str) -> dict:
+T = TypeVar("T")
+
+_cache = None
+_memory = None
+_backend = None
+_batcher = None
+_scheduler = None
+_flights = SingleFlight()
+_speculations = None
+_local = {"checked": 0, "same_language": 0, "nothing_to_translate": 0}
+
+def get_translation_cache() -> TranslationCache:
+    """
+    Return the shared translation cache, creating it on first use.
+    Tunables: TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_MAX_BYTES,
+    TRANSLATION_CACHE_TTL (seconds) and TRANSLATION_CACHE_PATH (SQLite file, optional).
+    """
+    global _cache
+    if _cache is None:
+        _cache = TranslationCache(
+            max_entries=env_int("TRANSLATION_CACHE_SIZE", 2048),
+            max_bytes=env_int("TRANSLATION_CACHE_MAX_BYTES", 8 * 1024 * 1024),
+            ttl=env_float("TRANSLATION_CACHE_TTL", 86400.0),
+            disk_path=env_str("TRANSLATION_CACHE_PATH")
+        )
+    return _cache
+
+def translation_cache_stats() -> dict:
+    """
+    Hit/miss/eviction counters of the shared translation cache.
+    """
+    return get_translation_cache().stats()
+
+def get_translation_memory() -> Optional[TranslationMemory]:
+    """
+    Return the shared translation memory, or None when it's disabled.
+    Tunables: TRANSLATION_MEMORY (enable), TRANSLATION_MEMORY_SIZE,
+    TRANSLATION_MEMORY_THRESHOLD (0-1) and TRANSLATION_MEMORY_PATH (SQLite file, optional).
+    """
+    global _memory
+    if _memory is None:
+        if not env_bool("TRANSLATION_MEMORY", False):
+            return None
+        _memory = TranslationMemory(
+            max_entries=env_int("TRANSLATION_MEMORY_SIZE", 5000),
+            threshold=env_float("TRANSLATION_MEMORY_THRESHOLD", 0.8),
+            path=env_str("TRANSLATION_MEMORY_PATH")
+        )
+    return _memory
+
+def translation_memory_stats() -> dict:
+    """
+    How many translations the translation memory reused or patched (empty when disabled).
+    """
+    memory = get_translation_memory()
+    return memory.stats() if memory is not None else {}
+
+def single_flight_stats() -> dict:
+    """
+    How many upstream translations were started vs. joined by concurrent callers.
+    """
+    return _flights.stats()
+
+def get_batcher() -> Optional[TranslationBatcher]:
+    """
+    Return the shared micro-batching dispatcher, or None when batching is disabled.
+    Tunables: TRANSLATION_BATCH_WINDOW_MS (0 disables batching), TRANSLATION_BATCH_MAX_ITEMS
+    and TRANSLATION_BATCH_MAX_CHARS.
+    """
+    global _batcher
+    if _batcher is None:
+        window_ms = env_float("TRANSLATION_BATCH_WINDOW_MS", 0.0)
+        if window_ms <= 0:
+            return None
+        _batcher = TranslationBatcher(
+            _translate_batch_upstream,
+            window=window_ms / 1000.0,
+            max_items=env_int("TRANSLATION_BATCH_MAX_ITEMS", 16),
+            max_chars=env_int("TRANSLATION_BATCH_MAX_CHARS", 4000)
+        )
+    return _batcher
+
+def batcher_stats() -> dict:
+    """
+    Batch counts and fill ratio of the micro-batching dispatcher (empty when disabled).
+    """
+    batcher = get_batcher()
+    return batcher.stats() if batcher is not None else {}
+
+def _parse_guild_weights(value: Optional[str]) -> dict:
+    weights = {}
+    for item in (value or "").split(","):
+        guild_id, _, weight = item.partition(":")
+        if guild_id.strip().isdigit() and weight.strip().isdigit():
+            weights[int(guild_id)] = max(1, int(weight))
+    return weights
+
+def get_scheduler() -> Optional[UpstreamScheduler]:
+    """
+    Return the shared upstream scheduler, or None when rate limiting is disabled.
+    Tunables: TRANSLATION_RATE_LIMIT (requests per second, 0 disables), TRANSLATION_RATE_BURST,
+    TRANSLATION_QUEUE_SIZE, TRANSLATION_QUEUE_PER_USER and TRANSLATION_GUILD_WEIGHTS
+    ("guild_id:weight,..." for guilds that should get a bigger share).
+    """
+    global _scheduler
+    if _scheduler is None:
+        rate = env_float("TRANSLATION_RATE_LIMIT", 10.0)
+        if rate <= 0:
+            return None
+        _scheduler = UpstreamScheduler(
+            rate=rate,
+            burst=env_int("TRANSLATION_RATE_BURST", 20),
+            max_queue=env_int("TRANSLATION_QUEUE_SIZE", 200),
+            max_per_user=env_int("TRANSLATION_QUEUE_PER_USER", 5),
+            guild_weights=_parse_guild_weights(env_str("TRANSLATION_GUILD_WEIGHTS"))
+        )
+    return _scheduler
+
+def scheduler_stats() -> dict:
+    """
+    Queue depth, wait times and rejections of the upstream scheduler (empty when disabled).
+    """
+    scheduler = get_scheduler()
+    return scheduler.stats() if scheduler is not None else {}
+
+def local_translation(text: str, dest_language: str) -> Optional[dict]:
+    """
+    A translation that needs no upstream call: the text itself, when it's confidently
+    in dest_language already or has nothing to translate (only emoji, links, code...).
+    Otherwise None. Tunables: TRANSLATION_LANGID (enable) and TRANSLATION_LANGID_CONFIDENCE.
+    """
+    if not env_bool("TRANSLATION_LANGID", True):
+        return None
+    _local["checked"] += 1
+    detection = detect_language(text)
+    if not detection.translatable:
+        _local["nothing_to_translate"] += 1
+        return {"translated_text": text, "src_language": dest_language, "dest_language": dest_language}
+    if (detection.language == dest_language.lower()
+            and detection.confidence >= env_float("TRANSLATION_LANGID_CONFIDENCE", 0.9)):
+        _local["same_language"] += 1
+        return {"translated_text": text, "src_language": detection.language, "dest_language": dest_language}
+    return None
+
+def local_translation_stats() -> dict:
+    """
+    How many translations were checked locally and answered without an upstream call.
+    """
+    return dict(_local)
+
+def get_speculations() -> Optional[SpeculativeTasks]:
+    """
+    Return the registry of translations started before the user asked for them,
+    or None when speculation is disabled.
+    Tunables: TRANSLATION_SPECULATE, TRANSLATION_SPECULATE_PER_USER and
+    TRANSLATION_SPECULATE_TTL (seconds).
+    """
+    global _speculations
+    if _speculations is None:
+        if not env_bool("TRANSLATION_SPECULATE", True):
+            return None
+        _speculations = SpeculativeTasks(
+            max_per_owner=env_int("TRANSLATION_SPECULATE_PER_USER", 2),
+            ttl=env_float("TRANSLATION_SPECULATE_TTL", 60.0)
+        )
+    return _speculations
+
+def speculation_stats() -> dict:
+    """
+    How many speculative translations were started, used, cancelled by a different
+    choice, evicted by the caps or left to expire (empty when disabled).
+    """
+    speculations = get_speculations()
+    return speculations.stats() if speculations is not None else {}
+
+def speculate_translation(text: str, dest_language: str, key: str,
+                          user_id: int, guild_id: Optional[int] = None) -> bool:
+    """
+    Start translating text in the background on a guess that user_id will ask for
+    dest_language. Pick the result up with claim_speculation(user_id, key, ...).
+    Without text, an earlier guess for key is cancelled and nothing is started.
+    """
+    speculations = get_speculations()
+    if speculations is None:
+        return False
+    if not text or not text.strip():
+        speculations.cancel(user_id, key)
+        return False
+    return speculations.start(
+        user_id, key, dest_language,
+        lambda: translate_text(text, dest_language, user_id=user_id, guild_id=guild_id)
+    )
+
+async def claim_speculation(user_id: int, key: str, dest_language: str) -> Optional[dict]:
+    """
+    The result of the translation speculated for (user_id, key) if it guessed
+    dest_language and succeeded, else None. A wrong guess is cancelled.
+    """
+    speculations = get_speculations()
+    task = speculations.claim(user_id, key, dest_language) if speculations is not None else None
+    if task is None:
+        return None
+    try:
+        result = await task
+    except asyncio.CancelledError:
+        if task.cancelled():
+            return None
+        raise
+    # A failed guess (e.g. the deadline passed before the user clicked) is retried by the caller
+    return result if result["success"] else None
+
+def open_translator(backend: Optional[TranslationBackend] = None) -> ResilientBackend:
+    """
+    Create the shared translation backend used by every translation.
+    The backend is chosen by TRANSLATION_BACKEND ("googletrans" or "fake") unless one
+    is passed in, and is wrapped with a circuit breaker (TRANSLATION_BREAKER_THRESHOLD
+    failures in a row open it for TRANSLATION_BREAKER_RESET seconds) and optional hedged
+    requests (TRANSLATION_HEDGE, TRANSLATION_HEDGE_PERCENTILE, TRANSLATION_HEDGE_MIN_MS).
+    Calling it again while a backend is open returns the existing one.
+    """
+    global _backend
+    if _backend is not None:
+        return _backend
+
+    if backend is None:
+        backend = create_backend(env_str("TRANSLATION_BACKEND", "googletrans"))
+    _backend = ResilientBackend(
+        backend,
+        breaker=CircuitBreaker(
+            failure_threshold=env_int("TRANSLATION_BREAKER_THRESHOLD", 5),
+            reset_timeout=env_float("TRANSLATION_BREAKER_RESET", 30.0)
+        ),
+        hedge=env_bool("TRANSLATION_HEDGE", False),
+        hedge_percentile=env_float("TRANSLATION_HEDGE_PERCENTILE", 95.0),
+        hedge_min_delay=env_float("TRANSLATION_HEDGE_MIN_MS", 50.0) / 1000.0
+    )
+    return _backend
+
+async def warm_up_translator():
+    """
+    Load and open the translation backend ahead of the first translation.
+    The backend's imports run in a worker thread, so commands keep being served
+    while it warms up; a translation arriving first simply opens it itself.
+    """
+    if _backend is None:
+        name = env_str("TRANSLATION_BACKEND", "googletrans")
+        await asyncio.get_running_loop().run_in_executor(None, preload_backend, name)
+    open_translator()
+    get_translation_cache()
+    memory = get_translation_memory()
+    if memory is not None:
+        await memory.load()
+
+def backend_stats() -> dict:
+    """
+    Circuit breaker state, recent p95 latency and hedging counters of the backend
+    (empty until it is opened).
+    """
+    return _backend.stats() if _backend is not None else {}
+
+async def close_translator():
+    """
+    Close the shared translation backend and cache. Safe to call more than once.
+    """
+    global _backend, _cache, _memory, _batcher, _scheduler, _speculations
+    if _speculations is not None:
+        speculations, _speculations = _speculations, None
+        speculations.clear()
+    _batcher = None
+    _scheduler = None
+    if _backend is not None:
+        backend, _backend = _backend, None
+        await backend.aclose()
+    if _cache is not None:
+        cache, _cache = _cache, None
+        cache.close()
+    if _memory is not None:
+        memory, _memory = _memory, None
+        memory.close()
+
+async def _translate_batch_upstream(texts: List[str], dest_language: str) -> List[dict]:
+    # Falls back to opening the shared backend here when used outside the bot
+    return await open_translator().translate_batch(texts, dest_language)
+
+async def _fetch_translation(text: str, dest_language: str) -> dict:
+    batcher = get_batcher()
+    if batcher is not None and BATCH_SEPARATOR not in text:
+        translation = await batcher.submit(text, dest_language)
+    else:
+        translation = await open_translator().translate(text, dest_language)
+    await get_translation_cache().set(text, dest_language, translation)
+    memory = get_translation_memory()
+    if memory is not None:
+        await memory.add(text, dest_language, translation)
+    return translation
+
+async def _admit_and_fetch(text: str, dest_language: str, guild_id, user_id) -> dict:
+    # Runs once per flight: callers joining a translation in flight cost no upstream quota
+    scheduler = get_scheduler()
+    if scheduler is not None:
+        await scheduler.acquire(guild_id, user_id)
+    return await _fetch_translation(text, dest_language)
+
+async def translate_text(text: str, dest_language: str, deadline: Optional[float] = None,
+                         user_id: Optional[int] = None, guild_id: Optional[int] = None,
+                         use_memory: bool = True) -> dict:
     """
     Translate text to the specified language and return result details.
     This is an async function that awaits the translation.
+    Successful results are cached per (normalized text, target language), and
+    concurrent requests for the same pair share one upstream call. Text that is
+    already in the target language, or has nothing to translate, never goes upstream,
+    and near-duplicates of earlier texts are adapted from the translation memory
+    unless use_memory is False.
+    deadline (seconds, default TRANSLATION_DEADLINE) bounds how long this call waits.
+    user_id and guild_id decide the caller's fair share of the upstream rate limit.
     """
-    translator = Translator()
+    cache = get_translation_cache()
+    cached = await cache.get(text, dest_language)
+    if cached is not None:
+        return {
+            "success": True,
+            "original_text": text,
+            **cached
+        }
+
+    local = local_translation(text, dest_language)
+    if local is not None:
+        return {
+            "success": True,
+            "original_text": text,
+            **local
+        }
+
+    memory = get_translation_memory() if use_memory else None
+    if memory is not None:
+        remembered = await memory.lookup(text, dest_language)
+        if remembered is not None:
+            return {
+                "success": True,
+                "original_text": text,
+                **remembered
+            }
+
+    if deadline is None:
+        deadline = env_float("TRANSLATION_DEADLINE", 8.0)
     try:
-        # Properly await the translation as it's a coroutine
-        result = await translator.translate(text, dest=dest_language)
+        translation = await asyncio.wait_for(
+            _flights.do(
+                cache_key(text, dest_language),
+                lambda: _admit_and_fetch(text, dest_language, guild_id, user_id)
+            ),
+            timeout=deadline
+        )
         return {
             "success": True,
             "original_text": text,
-            "translated_text": result.text,
-            "src_language": result.src,
-            "dest_language": result.dest
+            **translation
+        }
+    except asyncio.TimeoutError:
+        return {
+            "success": False,
+            "error": str(TranslationTimeout()),
+            "original_text": text
         }
     except Exception as e:
         return {
             "success": False,
             "error": str(e),
             "original_text": text
-        }
\ No newline at end of file
+        }
+
+async def translate_many(text: str, dest_languages: Sequence[str], deadline: Optional[float] = None,
+                         concurrency: Optional[int] = None, user_id: Optional[int] = None,
+                         guild_id: Optional[int] = None) -> AsyncIterator[List[Tuple[str, dict]]]:
+    """
+    Translate text to several languages at once, at most `concurrency` at a time
+    (default TRANSLATION_FANOUT_CONCURRENCY). Each language gets its own deadline,
+    and a failed language doesn't stop the others.
+    Yields (language, result) pairs in batches, as they finish; a batch holds every
+    result that finished since the previous one, so callers can update once per batch.
+    """
+    if concurrency is None:
+        concurrency = env_int("TRANSLATION_FANOUT_CONCURRENCY", 5)
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def translate_one(language: str) -> Tuple[str, dict]:
+        async with slots:
+            return language, await translate_text(text, language, deadline=deadline,
+                                                  user_id=user_id, guild_id=guild_id)
+
+    pending = {asyncio.ensure_future(translate_one(language)) for language in dest_languages}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            yield [task.result() for task in done]
+    finally:
+        # The caller stopped early (or was cancelled); don't leave work running
+        for task in pending:
+            task.cancel()
+
+async def translate_stream(items: AsyncIterable[T], text_of: Callable[[T], str], dest_language: str,
+                           concurrency: Optional[int] = None, user_id: Optional[int] = None,
+                           guild_id: Optional[int] = None) -> AsyncIterator[Tuple[T, dict]]:
+    """
+    Translate a stream of items (e.g. messages) to dest_language, yielding
+    (item, result) pairs in the order the items came in. Up to `concurrency`
+    translations (default TRANSLATION_FANOUT_CONCURRENCY) run ahead of the
+    consumer, and the next item is only pulled once one of them is handed over,
+    so memory stays bounded however long the stream is.
+    """
+    if concurrency is None:
+        concurrency = env_int("TRANSLATION_FANOUT_CONCURRENCY", 5)
+    window = deque()
+    iterator = items.__aiter__()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(window) < max(1, concurrency):
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                window.append((item, asyncio.ensure_future(translate_text(
+                    text_of(item), dest_language, user_id=user_id, guild_id=guild_id
+                ))))
+            if not window:
+                return
+            item, task = window.popleft()
+            yield item, await task
+    finally:
+        for _, task in window:
+            task.cancel()
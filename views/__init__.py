@@ -1,8 +1,8 @@
-from .chroma_view import SelectionView, register_chroma_view
-from .translate_view import register_translate_view
+from .chroma_view import SelectionView, ColorizeSelect, ColorizeSubmit
+from .translate_view import TranslationView, LanguageSelect, TranslateSubmit
 
-__all__ = ["SelectionView", "register_chroma_view", "register_translate_view"]
+__all__ = ["SelectionView", "TranslationView", "setup_views"]
 
-def setup_views(tree, client):
-    register_chroma_view(tree)
-    register_translate_view(tree)
\ No newline at end of file
+def setup_views(client):
+    # Menu clicks are routed by custom_id, including menus opened before a restart
+    client.add_dynamic_items(ColorizeSelect, ColorizeSubmit, LanguageSelect, TranslateSubmit)
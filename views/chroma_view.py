@@ -1,109 +1,124 @@
-from discord import ui, ButtonStyle, Interaction, SelectOption, app_commands, Message
-from constants.ui import FORMAT_UI_OPTIONS, BACKGROUND_UI_OPTIONS, TEXT_UI_OPTIONS
-from utils.ansi_format import build_ansi_response
+import re
+from typing import NamedTuple
+from discord import ui, ButtonStyle, Interaction, Message
+from constants.ui import FORMAT_UI_OPTIONS, BACKGROUND_UI_OPTIONS, TEXT_UI_OPTIONS, MOBILE_UI_OPTIONS
+from utils.ansi_format import build_ansi_messages
+from utils.metrics import instrument
+from views.state import CUSTOM_ID_LIMIT, UNREADABLE_MESSAGE, message_ref, options_with_default, resolve_ref
+
+# chroma:c:<component>:<format>:<background>:<text color>:<mobile>:<message ref>
+_STATE_PATTERN = (r":(?P<format>\d{1,2}):(?P<background>\d{1,2}):(?P<text>\d{1,2}):"
+                  r"(?P<mobile>[01]):(?P<ref>#\d+|=.*)")
+SELECT_TEMPLATE = re.compile(r"chroma:c:(?P<field>[fbtm])" + _STATE_PATTERN, re.DOTALL)
+SUBMIT_TEMPLATE = re.compile(r"chroma:c:s" + _STATE_PATTERN, re.DOTALL)
+
+class ColorizeState(NamedTuple):
+    """
+    The choices made in a Colorize menu and a reference to the message's text.
+    """
+    format_value: int = 0
+    background_color_value: int = 40
+    text_color_value: int = 32
+    mobile_friendly: bool = False
+    ref: str = "="
+
+    def custom_id(self, field: str) -> str:
+        return (f"chroma:c:{field}:{self.format_value}:{self.background_color_value}:"
+                f"{self.text_color_value}:{int(self.mobile_friendly)}:{self.ref}")
+
+    @classmethod
+    def from_match(cls, match: re.Match) -> "ColorizeState":
+        return cls(int(match["format"]), int(match["background"]), int(match["text"]),
+                   match["mobile"] == "1", match["ref"])
+
+# Room left for inline message text once the longest state is encoded
+REF_ROOM = CUSTOM_ID_LIMIT - len(ColorizeState(99, 99, 99, True, "").custom_id("s"))
+
+# Select fields: placeholder, options, and the state field they set
+SELECTS = {
+    "f": ("Pick a format...", FORMAT_UI_OPTIONS, "format_value"),
+    "b": ("Pick a background color...", BACKGROUND_UI_OPTIONS, "background_color_value"),
+    "t": ("Pick a text color...", TEXT_UI_OPTIONS, "text_color_value"),
+    "m": ("Mobile-friendly output? (Optional)", MOBILE_UI_OPTIONS, "mobile_friendly"),
+}
 
 class SelectionView(ui.View):
     """
     A View containing four dropdown selects for Format, Background color,
     Text color, and optional Mobile-friendly output, plus a Submit button.
+    The view is finished before it's sent, so discord.py doesn't keep it: clicks
+    are handled by ColorizeSelect and ColorizeSubmit from their custom_ids, and
+    open menus keep working after a restart.
     """
-    def __init__(self, message_text: str):
-        super().__init__(timeout=120)
-        self.message_text = message_text
-        
-        # Default values (if user never picks anything)
-        self.format_value = 0
-        self.background_color_value = 40
-        self.text_color_value = 32
-        self.mobile_friendly_value = None
-
-        self.add_item(FormatSelect(row=0))
-        self.add_item(BackgroundColorSelect(row=1))
-        self.add_item(TextColorSelect(row=2))
-        self.add_item(MobileFriendlySelect(row=3))
-    
-    @ui.button(label="Submit", style=ButtonStyle.green, row=4)
-    async def submit_button(self, interaction: Interaction, button: ui.Button):
-        mobile_flag = (self.mobile_friendly_value == "yes")
-        response = build_ansi_response(self.message_text, self.format_value, self.text_color_value, self.background_color_value, mobile_flag)
-        await interaction.response.defer()
-        await interaction.delete_original_response()
-        await interaction.followup.send(content=response, ephemeral=True)
+    def __init__(self, state: ColorizeState):
+        super().__init__(timeout=None)
+        self.state = state
+        for row, field in enumerate(SELECTS):
+            self.add_item(ColorizeSelect(state, field, row=row))
+        self.submit_button = ColorizeSubmit(state, row=4)
+        self.add_item(self.submit_button)
         self.stop()
 
-class FormatSelect(ui.Select):
-    def __init__(self, row: int = 0):
-        super().__init__(
-            placeholder="Pick a format...",
-            min_values=1,
-            max_values=1,
-            options=FORMAT_UI_OPTIONS,
-            row=row
-        )
-    
-    async def callback(self, interaction: Interaction):
-        parent_view = self.view
-        if isinstance(parent_view, SelectionView):
-            parent_view.format_value = int(self.values[0])
-        await interaction.response.defer()
+    @classmethod
+    def for_message(cls, message: Message) -> "SelectionView":
+        return cls(ColorizeState(ref=message_ref(message, REF_ROOM)))
 
-class BackgroundColorSelect(ui.Select):
-    def __init__(self, row: int = 1):
+class ColorizeSelect(ui.DynamicItem[ui.Select], template=SELECT_TEMPLATE):
+    def __init__(self, state: ColorizeState, field: str, row: int = None):
+        placeholder, options, attribute = SELECTS[field]
+        value = getattr(state, attribute)
+        selected = ("yes" if value else None) if field == "m" else str(value)
         super().__init__(
-            placeholder="Pick a background color...",
-            min_values=1,
-            max_values=1,
-            options=BACKGROUND_UI_OPTIONS,
+            ui.Select(
+                custom_id=state.custom_id(field),
+                placeholder=placeholder,
+                min_values=0 if field == "m" else 1,
+                max_values=1,
+                options=options_with_default(options, selected)
+            ),
             row=row
         )
-    
-    async def callback(self, interaction: Interaction):
-        parent_view = self.view
-        if isinstance(parent_view, SelectionView):
-            parent_view.background_color_value = int(self.values[0])
-        await interaction.response.defer()
+        self.state = state
+        self.field = field
 
-class TextColorSelect(ui.Select):
-    def __init__(self, row: int = 2):
-        super().__init__(
-            placeholder="Pick a text color...",
-            min_values=1,
-            max_values=1,
-            options=TEXT_UI_OPTIONS,
-            row=row
-        )
-    
+    @classmethod
+    async def from_custom_id(cls, interaction: Interaction, item: ui.Select, match: re.Match):
+        return cls(ColorizeState.from_match(match), match["field"])
+
+    @instrument("colorize_select")
     async def callback(self, interaction: Interaction):
-        parent_view = self.view
-        if isinstance(parent_view, SelectionView):
-            parent_view.text_color_value = int(self.values[0])
-        await interaction.response.defer()
+        _, _, attribute = SELECTS[self.field]
+        values = self.item.values
+        if self.field == "m":
+            value = bool(values) and values[0] == "yes"
+        else:
+            value = int(values[0])
+        # Re-render the menu with the new choice encoded in every component
+        state = self.state._replace(**{attribute: value})
+        await interaction.response.edit_message(view=SelectionView(state))
 
-class MobileFriendlySelect(ui.Select):
-    def __init__(self, row: int = 3):
-        options = [
-            SelectOption(label="Yes", value="yes")
-        ]
+class ColorizeSubmit(ui.DynamicItem[ui.Button], template=SUBMIT_TEMPLATE):
+    def __init__(self, state: ColorizeState, row: int = None):
         super().__init__(
-            placeholder="Mobile-friendly output? (Optional)",
-            min_values=0,
-            max_values=1,
-            options=options,
+            ui.Button(label="Submit", style=ButtonStyle.green, custom_id=state.custom_id("s")),
             row=row
         )
-    
+        self.state = state
+
+    @classmethod
+    async def from_custom_id(cls, interaction: Interaction, item: ui.Button, match: re.Match):
+        return cls(ColorizeState.from_match(match))
+
+    @instrument("colorize_submit")
     async def callback(self, interaction: Interaction):
-        parent_view = self.view
-        if isinstance(parent_view, SelectionView) and self.values:
-            parent_view.mobile_friendly_value = self.values[0]
+        state = self.state
         await interaction.response.defer()
-
-def register_chroma_view(tree: app_commands.CommandTree):
-    @tree.context_menu(name="Colorize")
-    async def colorize_message(interaction: Interaction, message: Message):
-        view = SelectionView(message.content or "Sample text")
-        await interaction.response.send_message(
-            content="Choose format, colors, and mobile output, then click **Submit**.",
-            view=view,
-            ephemeral=True
-        )
\ No newline at end of file
+        message_text = await resolve_ref(interaction, state.ref)
+        await interaction.delete_original_response()
+        if message_text is None:
+            await interaction.followup.send(content=UNREADABLE_MESSAGE, ephemeral=True)
+            return
+        responses = build_ansi_messages(message_text or "Sample text", state.format_value, state.text_color_value,
+                                        state.background_color_value, state.mobile_friendly)
+        for response in responses:
+            await interaction.followup.send(content=response, ephemeral=True)
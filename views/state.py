@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+from discord import HTTPException, Interaction, Message, SelectOption
+
+# Menus keep no state in memory. Each component's custom_id carries everything the
+# menu needs, and the dynamic items registered in views/__init__.py rebuild it on click.
+# The one exception is the text of messages too long for a custom_id, see message_ref.
+
+# Discord's limit for a component custom_id
+CUSTOM_ID_LIMIT = 100
+# Long message texts kept for menus, by message id, least recently used first. Without
+# the Message Content intent a context menu is the only time the bot sees another
+# user's message in full; re-fetching it later returns it empty.
+LONG_TEXTS_SIZE = 1024
+_long_texts = OrderedDict()
+
+def _length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+def message_ref(message: Message, room: int) -> str:
+    """
+    Reference to a message's text for a custom_id: "=<text>" when the text fits in
+    `room` characters, otherwise "#<message id>", with the text kept in memory and
+    re-fetched if it's gone (after a restart, or once LONG_TEXTS_SIZE newer ones are kept).
+    """
+    text = message.content or ""
+    if _length(text) + 1 <= room:
+        return "=" + text
+    _long_texts[message.id] = text
+    _long_texts.move_to_end(message.id)
+    if len(_long_texts) > LONG_TEXTS_SIZE:
+        _long_texts.popitem(last=False)
+    return f"#{message.id}"
+
+def cached_ref(ref: str) -> Optional[str]:
+    """
+    The text a message_ref points to if it's at hand without a fetch, otherwise None.
+    """
+    if ref.startswith("="):
+        return ref[1:]
+    try:
+        message_id = int(ref[1:])
+    except ValueError:
+        return None
+    text = _long_texts.get(message_id)
+    if text is not None:
+        _long_texts.move_to_end(message_id)
+    return text
+
+async def resolve_ref(interaction: Interaction, ref: str) -> Optional[str]:
+    """
+    The text a message_ref points to, or None if the message can't be read.
+    Fetched messages come from the channel the component was used in.
+    """
+    text = cached_ref(ref)
+    if text is not None:
+        return text
+    try:
+        message = await interaction.channel.fetch_message(int(ref[1:]))
+    except (HTTPException, ValueError, AttributeError):
+        return None
+    if not message.content and not interaction.client.intents.message_content:
+        # Without the Message Content intent, other users' messages come back empty
+        return None
+    return message.content
+
+UNREADABLE_MESSAGE = (
+    "Error: I couldn't read that message anymore. It may have been deleted, or the bot "
+    "needs the Message Content intent to read long messages."
+)
+
+@lru_cache(maxsize=256)
+def _marked(options: Tuple[SelectOption, ...], selected: Optional[str]) -> Tuple[SelectOption, ...]:
+    return tuple(
+        SelectOption(label=option.label, value=option.value, description=option.description,
+                     emoji=option.emoji, default=option.value == selected)
+        for option in options
+    )
+
+def options_with_default(options: Sequence[SelectOption], selected: Optional[str]) -> list:
+    """
+    Copy of a select's options with the current choice shown as selected,
+    since a re-rendered menu would otherwise show the placeholder again.
+    """
+    return list(_marked(tuple(options), selected))
@@ -1,34 +1,147 @@
-from discord import ui, ButtonStyle, Interaction, Embed, Color, app_commands, Message
+import re
+from typing import NamedTuple, Optional
+from discord import ui, ButtonStyle, Interaction, Embed, Color, Message
 from constants.ui import LANGUAGE_UI_OPTIONS
-from utils.translator import translate_text
+from utils.translator import translate_text, speculate_translation, claim_speculation
+from utils.metrics import instrument
+from views.state import CUSTOM_ID_LIMIT, UNREADABLE_MESSAGE, cached_ref, message_ref, options_with_default, resolve_ref
+
+# chroma:t:<component>:<target language>:<message ref>
+_STATE_PATTERN = r":(?P<language>[A-Za-z\-]{2,10}):(?P<ref>#\d+|=.*)"
+SELECT_TEMPLATE = re.compile(r"chroma:t:l" + _STATE_PATTERN, re.DOTALL)
+SUBMIT_TEMPLATE = re.compile(r"chroma:t:s" + _STATE_PATTERN, re.DOTALL)
+
+class TranslateState(NamedTuple):
+    """
+    The language chosen in a Translate menu and a reference to the message's text.
+    """
+    target_language: str = "en"
+    ref: str = "="
+
+    def custom_id(self, field: str) -> str:
+        return f"chroma:t:{field}:{self.target_language}:{self.ref}"
+
+    @classmethod
+    def from_match(cls, match: re.Match) -> "TranslateState":
+        return cls(match["language"], match["ref"])
+
+# Room left for inline message text once the longest language code is encoded
+REF_ROOM = CUSTOM_ID_LIMIT - max(
+    len(TranslateState(option.value, "").custom_id("s")) for option in LANGUAGE_UI_OPTIONS
+)
+
+_LANGUAGES = {option.value for option in LANGUAGE_UI_OPTIONS}
+
+def _language_for_locale(locale) -> Optional[str]:
+    # Discord locales look like "en-US", "zh-CN" or "fr"
+    if locale is None:
+        return None
+    value = str(locale).lower()
+    if value in _LANGUAGES:
+        return value
+    prefix = value.split("-", 1)[0]
+    return prefix if prefix in _LANGUAGES else None
+
+def guess_language(interaction: Interaction) -> str:
+    """
+    The language a user most likely wants: their Discord locale, then the
+    server's, then TranslateState's default.
+    """
+    return (_language_for_locale(interaction.locale)
+            or _language_for_locale(interaction.guild_locale)
+            or TranslateState().target_language)
+
+def speculate(interaction: Interaction, state: TranslateState, text: Optional[str]):
+    """
+    Start translating text to the language selected in state before the user
+    clicks Submit, which then picks the result up.
+    """
+    speculate_translation(text, state.target_language, state.ref,
+                          user_id=interaction.user.id, guild_id=interaction.guild_id)
 
 class TranslationView(ui.View):
     """
     A View containing a language dropdown select and a Submit button.
+    Like SelectionView, it is finished before it's sent and rebuilt from the
+    components' custom_ids on every click.
     """
-    def __init__(self, message_text: str):
-        super().__init__(timeout=120)
-        self.message_text = message_text
-        
-        # Default target language
-        self.target_language = "en"
-        
-        self.add_item(LanguageSelect(row=0))
-    
-    @ui.button(label="Submit", style=ButtonStyle.green, row=1)
-    async def submit_button(self, interaction: Interaction, button: ui.Button):
+    def __init__(self, state: TranslateState):
+        super().__init__(timeout=None)
+        self.state = state
+        self.add_item(LanguageSelect(state, row=0))
+        self.submit_button = TranslateSubmit(state, row=1)
+        self.add_item(self.submit_button)
+        self.stop()
+
+    @classmethod
+    def for_message(cls, message: Message, target_language: str = "en") -> "TranslationView":
+        return cls(TranslateState(target_language, message_ref(message, REF_ROOM)))
+
+class LanguageSelect(ui.DynamicItem[ui.Select], template=SELECT_TEMPLATE):
+    def __init__(self, state: TranslateState, row: int = None):
+        super().__init__(
+            ui.Select(
+                custom_id=state.custom_id("l"),
+                placeholder="Select a language to translate to...",
+                min_values=1,
+                max_values=1,
+                options=options_with_default(LANGUAGE_UI_OPTIONS, state.target_language)
+            ),
+            row=row
+        )
+        self.state = state
+
+    @classmethod
+    async def from_custom_id(cls, interaction: Interaction, item: ui.Select, match: re.Match):
+        return cls(TranslateState.from_match(match))
+
+    @instrument("language_select")
+    async def callback(self, interaction: Interaction):
+        state = self.state._replace(target_language=self.item.values[0])
+        await interaction.response.edit_message(view=TranslationView(state))
+        # Guess again; if the text isn't at hand (not worth a fetch yet) the old guess is just cancelled
+        speculate(interaction, state, cached_ref(state.ref))
+
+class TranslateSubmit(ui.DynamicItem[ui.Button], template=SUBMIT_TEMPLATE):
+    def __init__(self, state: TranslateState, row: int = None):
+        super().__init__(
+            ui.Button(label="Submit", style=ButtonStyle.green, custom_id=state.custom_id("s")),
+            row=row
+        )
+        self.state = state
+
+    @classmethod
+    async def from_custom_id(cls, interaction: Interaction, item: ui.Button, match: re.Match):
+        return cls(TranslateState.from_match(match))
+
+    @instrument("translate_submit")
+    async def callback(self, interaction: Interaction):
         await interaction.response.defer(ephemeral=True)
-        
-        # Await the translation
-        result = await translate_text(self.message_text, self.target_language)
-        
+
+        # Started when the menu opened, if the guessed language was kept
+        result = await claim_speculation(interaction.user.id, self.state.ref, self.state.target_language)
+        if result is None:
+            message_text = await resolve_ref(interaction, self.state.ref)
+            if message_text is None:
+                await interaction.delete_original_response()
+                await interaction.followup.send(UNREADABLE_MESSAGE, ephemeral=True)
+                return
+
+            # Await the translation
+            result = await translate_text(
+                message_text,
+                self.state.target_language,
+                user_id=interaction.user.id,
+                guild_id=interaction.guild_id
+            )
+
         # Delete the original response (the selection UI)
         await interaction.delete_original_response()
-        
+
         if result["success"]:
             detected_language = result["src_language"]
             target_language = result["dest_language"]
-            
+
             embed = Embed(
                 title="Translation",
                 color=Color.blue()
@@ -43,44 +156,10 @@ class TranslationView(ui.View):
                 value=result["translated_text"],
                 inline=False
             )
-            
+
             await interaction.followup.send(embed=embed, ephemeral=True)
         else:
             await interaction.followup.send(
                 f"Error translating: {result['error']}",
                 ephemeral=True
             )
-        self.stop()
-
-class LanguageSelect(ui.Select):
-    def __init__(self, row: int = 0):
-        super().__init__(
-            placeholder="Select a language to translate to...",
-            min_values=1,
-            max_values=1,
-            options=LANGUAGE_UI_OPTIONS,
-            row=row
-        )
-
-    async def callback(self, interaction: Interaction):
-        parent_view = self.view
-        if isinstance(parent_view, TranslationView):
-            parent_view.target_language = self.values[0]
-        await interaction.response.defer()
-
-def register_translate_view(tree: app_commands.CommandTree):
-    @tree.context_menu(name="Translate")
-    async def translate_context_menu(
-        interaction: Interaction,
-        message: Message
-    ):
-        """
-        Context menu command for translation.
-        Right-click on a message -> Apps -> Translate.
-        """
-        view = TranslationView(message.content if message.content else "")
-        await interaction.response.send_message(
-            content="Select a language to translate to, then click **Submit**.",
-            view=view,
-            ephemeral=True
-        )
\ No newline at end of file